@@ -1,4 +1,5 @@
 import json
+import numpy as np
 
 print("\n" + "=" * 80)
 print("MODEL COMPARISON: BEFORE vs AFTER FIX")
@@ -19,16 +20,17 @@ before_predictions = [
 print(f"\n{'Game':<30} {'BEFORE':<20} {'AFTER':<20}")
 print("-" * 80)
 
-total_edge_before = 0
-total_edge_after = 0
+# Compare only the games present in both sets
+n_games = min(len(before_predictions), len(current['predictions']))
+before_games = before_predictions[:n_games]
+after_games = current['predictions'][:n_games]
 
-for before, after in zip(before_predictions, current['predictions']):
-    before_edge = before['edge']
-    after_edge = after['edge']
-    
-    total_edge_before += abs(before_edge)
-    total_edge_after += abs(after_edge)
-    
+before_edges = np.fromiter((game['edge'] for game in before_games), dtype=np.float64, count=n_games)
+after_edges = np.fromiter((game['edge'] for game in after_games), dtype=np.float64, count=n_games)
+total_edge_before = float(np.abs(before_edges).sum())
+total_edge_after = float(np.abs(after_edges).sum())
+
+for before, after, before_edge, after_edge in zip(before_games, after_games, before_edges, after_edges):
     before_str = f"Edge: {before_edge:+6.1f} (Total: {before['model_total']:.1f})"
     after_str = f"Edge: {after_edge:+6.1f} (Total: {after['model_total']:.1f})"
     print(f"{before['game']:<30} {before_str:<25} {after_str:<25}")
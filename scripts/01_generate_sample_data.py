@@ -1,14 +1,14 @@
 """
 NFL Betting Analysis - Sample Data Generator
-Run this script first to create the CSV files needed for the analysis.
+Run this script first to create the data files needed for the analysis.
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-# Set seed for reproducibility
-np.random.seed(42)
+# Seeded generator for reproducibility
+rng = np.random.default_rng(42)
 
 # Create data directory
 data_dir = Path("data")
@@ -22,17 +22,17 @@ teams = [
     "NYJ", "PHI", "PIT", "SF", "SEA", "TB", "TEN", "WAS"
 ]
 
-# Generate team_epa_2025.csv - EPA metrics for each team
-print("Generating team_epa_2025.csv...")
+# Generate team_epa_2025.parquet - EPA metrics for each team
+print("Generating team_epa_2025.parquet...")
 team_epa_data = []
 for team in teams:
     # Generate realistic EPA values (typically between -0.3 and 0.3)
-    off_epa = np.random.normal(0, 0.12)
-    def_epa = np.random.normal(0, 0.12)  # Lower is better for defense
-    off_pass_epa = off_epa + np.random.normal(0, 0.05)
-    off_rush_epa = off_epa + np.random.normal(-0.05, 0.05)
-    def_pass_epa = def_epa + np.random.normal(0, 0.05)
-    def_rush_epa = def_epa + np.random.normal(-0.03, 0.05)
+    off_epa = rng.normal(0, 0.12)
+    def_epa = rng.normal(0, 0.12)  # Lower is better for defense
+    off_pass_epa = off_epa + rng.normal(0, 0.05)
+    off_rush_epa = off_epa + rng.normal(-0.05, 0.05)
+    def_pass_epa = def_epa + rng.normal(0, 0.05)
+    def_rush_epa = def_epa + rng.normal(-0.03, 0.05)
     
     team_epa_data.append({
         "team": team,
@@ -45,72 +45,68 @@ for team in teams:
     })
 
 team_epa_df = pd.DataFrame(team_epa_data)
-team_epa_df.to_csv(data_dir / "team_epa_2025.csv", index=False)
-print(f"  Created: {data_dir / 'team_epa_2025.csv'}")
+team_epa_df.to_parquet(data_dir / "team_epa_2025.parquet", engine="pyarrow", compression="zstd", index=False)
+print(f"  Created: {data_dir / 'team_epa_2025.parquet'}")
 
-# Generate team_points_2025.csv - Points per play metrics
-print("Generating team_points_2025.csv...")
+# Generate team_points_2025.parquet - Points per play metrics
+print("Generating team_points_2025.parquet...")
 team_points_data = []
 for team in teams:
     # Points per play typically 0.3-0.5, home advantage ~0.02-0.05
-    base_ppp = np.random.normal(0.38, 0.05)
-    home_bonus = np.random.uniform(0.02, 0.05)
+    base_ppp = rng.normal(0.38, 0.05)
+    home_bonus = rng.uniform(0.02, 0.05)
     
     team_points_data.append({
         "team": team,
         "points_per_play": round(base_ppp, 4),
         "points_per_play_home": round(base_ppp + home_bonus, 4),
         "points_per_play_away": round(base_ppp - home_bonus * 0.5, 4),
-        "plays_per_game": round(np.random.normal(62, 4), 1)
+        "plays_per_game": round(rng.normal(62, 4), 1)
     })
 
 team_points_df = pd.DataFrame(team_points_data)
-team_points_df.to_csv(data_dir / "team_points_2025.csv", index=False)
-print(f"  Created: {data_dir / 'team_points_2025.csv'}")
-
-# Generate games_2025.csv - Regular season games with scores
-print("Generating games_2025.csv...")
-games_data = []
-game_id = 1
+team_points_df.to_parquet(data_dir / "team_points_2025.parquet", engine="pyarrow", compression="zstd", index=False)
+print(f"  Created: {data_dir / 'team_points_2025.parquet'}")
 
+# Generate games_2025.parquet - Regular season games with scores
+print("Generating games_2025.parquet...")
 # Generate 17 weeks of games (simplified - not full NFL schedule)
-for week in range(1, 18):
-    # Shuffle teams for matchups each week
-    shuffled = teams.copy()
-    np.random.shuffle(shuffled)
-    
-    # Create 16 games per week
-    for i in range(0, 32, 2):
-        home_team = shuffled[i]
-        away_team = shuffled[i + 1]
-        
-        # Get team metrics to influence scores
-        home_epa = team_epa_df[team_epa_df["team"] == home_team]["off_epa_per_play"].values[0]
-        away_epa = team_epa_df[team_epa_df["team"] == away_team]["off_epa_per_play"].values[0]
-        home_def = team_epa_df[team_epa_df["team"] == home_team]["def_epa_per_play"].values[0]
-        away_def = team_epa_df[team_epa_df["team"] == away_team]["def_epa_per_play"].values[0]
-        
-        # Generate scores based on EPA (roughly 20-35 points typical)
-        home_base = 24 + (home_epa - away_def) * 30 + np.random.normal(0, 7)
-        away_base = 21 + (away_epa - home_def) * 30 + np.random.normal(0, 7)
-        
-        home_score = max(0, int(round(home_base)))
-        away_score = max(0, int(round(away_base)))
-        
-        games_data.append({
-            "game_id": game_id,
-            "week": week,
-            "date": f"2025-{9 + (week - 1) // 4:02d}-{((week - 1) % 4) * 7 + 8:02d}",
-            "home_team": home_team,
-            "away_team": away_team,
-            "home_score": home_score,
-            "away_score": away_score
-        })
-        game_id += 1
-
-games_df = pd.DataFrame(games_data)
-games_df.to_csv(data_dir / "games_2025.csv", index=False)
-print(f"  Created: {data_dir / 'games_2025.csv'}")
+n_weeks = 17
+games_per_week = len(teams) // 2
+
+# Team metrics as arrays aligned with `teams` so matchups are index gathers
+team_epa_lookup = team_epa_df.set_index("team").loc[teams]
+off_epa = team_epa_lookup["off_epa_per_play"].to_numpy()
+def_epa = team_epa_lookup["def_epa_per_play"].to_numpy()
+
+# Shuffle teams for matchups each week: even slots host odd slots
+week_orders = np.stack([rng.permutation(len(teams)) for _ in range(n_weeks)])
+home_idx = week_orders[:, 0::2]
+away_idx = week_orders[:, 1::2]
+
+# Generate scores based on EPA (roughly 20-35 points typical)
+home_base = 24 + (off_epa[home_idx] - def_epa[away_idx]) * 30 + rng.normal(0, 7, size=home_idx.shape)
+away_base = 21 + (off_epa[away_idx] - def_epa[home_idx]) * 30 + rng.normal(0, 7, size=away_idx.shape)
+
+home_scores = np.maximum(0, np.rint(home_base)).astype(int)
+away_scores = np.maximum(0, np.rint(away_base)).astype(int)
+
+# Assemble the schedule column-wise; rows run week by week in game order
+weeks = np.arange(1, n_weeks + 1)
+week_dates = [f"2025-{9 + (week - 1) // 4:02d}-{((week - 1) % 4) * 7 + 8:02d}" for week in weeks]
+team_names = np.array(teams)
+
+games_df = pd.DataFrame({
+    "game_id": np.arange(1, n_weeks * games_per_week + 1),
+    "week": np.repeat(weeks, games_per_week),
+    "date": np.repeat(week_dates, games_per_week),
+    "home_team": team_names[home_idx].ravel(),
+    "away_team": team_names[away_idx].ravel(),
+    "home_score": home_scores.ravel(),
+    "away_score": away_scores.ravel()
+})
+games_df.to_parquet(data_dir / "games_2025.parquet", engine="pyarrow", compression="zstd", index=False)
+print(f"  Created: {data_dir / 'games_2025.parquet'}")
 
 # Generate vegas_lines_divisional.csv - Playoff matchups with Vegas totals
 print("Generating vegas_lines_divisional.csv...")
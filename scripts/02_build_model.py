@@ -1,12 +1,14 @@
 """
 NFL Betting Analysis - Model Training
-Loads CSVs, builds training features with pandas, and fits a regression model.
+Loads Parquet files, builds training features with pandas, and fits a regression model.
 """
 
 import pandas as pd
-from sklearn.linear_model import LinearRegression
+import numpy as np
+from sklearn.linear_model import Ridge
 from sklearn.metrics import r2_score, mean_absolute_error
 import pickle
+import hashlib
 from pathlib import Path
 
 data_dir = Path("data")
@@ -14,13 +16,20 @@ models_dir = Path("models")
 models_dir.mkdir(exist_ok=True)
 
 # ============================================================================
-# B. Load CSVs
+# B. Load Parquet files
 # ============================================================================
-print("Loading CSV files...")
-
-team_epa_df = pd.read_csv(data_dir / "team_epa_2025.csv")
-team_points_df = pd.read_csv(data_dir / "team_points_2025.csv")
-games_df = pd.read_csv(data_dir / "games_2025.csv")
+print("Loading Parquet files...")
+
+team_epa_df = pd.read_parquet(data_dir / "team_epa_2025.parquet", columns=[
+    "team", "off_epa_per_play", "def_epa_per_play",
+    "off_pass_epa", "off_rush_epa", "def_pass_epa", "def_rush_epa"
+])
+team_points_df = pd.read_parquet(data_dir / "team_points_2025.parquet", columns=[
+    "team", "points_per_play", "points_per_play_home", "points_per_play_away", "plays_per_game"
+])
+games_df = pd.read_parquet(data_dir / "games_2025.parquet", columns=[
+    "game_id", "week", "date", "home_team", "away_team", "home_score", "away_score"
+])
 
 print(f"  ✓ Loaded {len(team_epa_df)} teams with EPA metrics")
 print(f"  ✓ Loaded {len(team_points_df)} teams with points metrics")
@@ -31,77 +40,60 @@ print(f"  ✓ Loaded {len(games_df)} games from 2025 season")
 # ============================================================================
 print("\nBuilding training features with pandas...")
 
-# Join home team EPA metrics
-game_features_df = games_df.merge(
-    team_epa_df.rename(columns={
-        "off_epa_per_play": "home_off_epa",
-        "off_pass_epa": "home_off_pass_epa",
-        "off_rush_epa": "home_off_rush_epa",
-        "def_epa_per_play": "home_def_epa",
-        "def_pass_epa": "home_def_pass_epa",
-        "def_rush_epa": "home_def_rush_epa"
-    }),
-    left_on="home_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Join away team EPA metrics
-game_features_df = game_features_df.merge(
-    team_epa_df.rename(columns={
-        "off_epa_per_play": "away_off_epa",
-        "off_pass_epa": "away_off_pass_epa",
-        "off_rush_epa": "away_off_rush_epa",
-        "def_epa_per_play": "away_def_epa",
-        "def_pass_epa": "away_def_pass_epa",
-        "def_rush_epa": "away_def_rush_epa"
-    }),
-    left_on="away_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Join home team points metrics
-game_features_df = game_features_df.merge(
-    team_points_df.rename(columns={
-        "points_per_play": "home_points_per_play",
-        "points_per_play_home": "home_ppp_at_home",
-        "points_per_play_away": "home_ppp_on_road",
-        "plays_per_game": "home_plays_per_game"
-    }),
-    left_on="home_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Join away team points metrics
-game_features_df = game_features_df.merge(
-    team_points_df.rename(columns={
-        "points_per_play": "away_points_per_play",
-        "points_per_play_home": "away_ppp_at_home",
-        "points_per_play_away": "away_ppp_on_road",
-        "plays_per_game": "away_plays_per_game"
-    }),
-    left_on="away_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Compute derived features
-game_features_df["total_points"] = game_features_df["home_score"] + game_features_df["away_score"]
-game_features_df["off_epa_diff"] = game_features_df["home_off_epa"] - game_features_df["away_off_epa"]
-game_features_df["def_epa_diff"] = game_features_df["home_def_epa"] - game_features_df["away_def_epa"]
-game_features_df["ppp_diff"] = game_features_df["home_points_per_play"] - game_features_df["away_points_per_play"]
-game_features_df["home_matchup_edge"] = game_features_df["home_off_epa"] - game_features_df["away_def_epa"]
-game_features_df["away_matchup_edge"] = game_features_df["away_off_epa"] - game_features_df["home_def_epa"]
-
-# Sort by week and game_id
-game_features_df = game_features_df.sort_values(["week", "game_id"]).reset_index(drop=True)
+# Reuse features built from identical inputs (and an unchanged build script)
+feature_inputs = [
+    data_dir / "team_epa_2025.parquet",
+    data_dir / "team_points_2025.parquet",
+    data_dir / "games_2025.parquet",
+    Path(__file__)
+]
+cache_key = hashlib.md5(str([
+    (path.name, path.stat().st_mtime_ns, path.stat().st_size) for path in feature_inputs
+]).encode()).hexdigest()
+features_cache = data_dir / "_cache" / f"features_{cache_key}.parquet"
+
+if features_cache.exists():
+    game_features_df = pd.read_parquet(features_cache)
+    print("  ✓ Reused cached training features")
+else:
+    # Index team metrics once so each side of the matchup is a single gather
+    team_metrics_df = pd.concat([
+        team_epa_df.set_index("team").rename(columns={
+            "off_epa_per_play": "off_epa",
+            "def_epa_per_play": "def_epa"
+        }),
+        team_points_df.set_index("team").rename(columns={
+            "points_per_play_home": "ppp_at_home",
+            "points_per_play_away": "ppp_on_road"
+        })
+    ], axis=1)
+
+    # Look up home and away team metrics
+    home_features_df = team_metrics_df.reindex(games_df["home_team"]).reset_index(drop=True).add_prefix("home_")
+    away_features_df = team_metrics_df.reindex(games_df["away_team"]).reset_index(drop=True).add_prefix("away_")
+
+    game_features_df = pd.concat([games_df.reset_index(drop=True), home_features_df, away_features_df], axis=1)
+
+    # Compute derived features
+    game_features_df["total_points"] = game_features_df["home_score"] + game_features_df["away_score"]
+    game_features_df["off_epa_diff"] = game_features_df["home_off_epa"] - game_features_df["away_off_epa"]
+    game_features_df["def_epa_diff"] = game_features_df["home_def_epa"] - game_features_df["away_def_epa"]
+    game_features_df["ppp_diff"] = game_features_df["home_points_per_play"] - game_features_df["away_points_per_play"]
+    game_features_df["home_matchup_edge"] = game_features_df["home_off_epa"] - game_features_df["away_def_epa"]
+    game_features_df["away_matchup_edge"] = game_features_df["away_off_epa"] - game_features_df["home_def_epa"]
+
+    # Sort by week and game_id
+    game_features_df = game_features_df.sort_values(["week", "game_id"]).reset_index(drop=True)
+
+    features_cache.parent.mkdir(exist_ok=True)
+    for stale_cache in features_cache.parent.glob("features_*.parquet"):
+        stale_cache.unlink()
+    game_features_df.to_parquet(features_cache, engine="pyarrow", compression="zstd", index=False)
 
 print(f"  ✓ Built training table with {len(game_features_df)} games and {len(game_features_df.columns)} features")
 
 # Save training data for reference
-game_features_df.to_csv(data_dir / "game_features_2025.csv", index=False)
+game_features_df.to_parquet(data_dir / "game_features_2025.parquet", engine="pyarrow", compression="zstd", index=False)
 
 # ============================================================================
 # D. Fit regression model for game totals
@@ -118,11 +110,13 @@ feature_columns = [
     "home_matchup_edge", "away_matchup_edge"
 ]
 
-X = game_features_df[feature_columns]
+# Materialize the design matrix once as contiguous float32 so sklearn doesn't re-copy it
+X = np.ascontiguousarray(game_features_df[feature_columns].to_numpy(dtype=np.float32))
 y = game_features_df["total_points"]
 
-# Fit the model
-model = LinearRegression()
+# Fit the model (near-zero ridge penalty keeps the collinear diff features
+# solvable with a Cholesky factorization while matching least squares)
+model = Ridge(alpha=1e-6, solver="cholesky")
 model.fit(X, y)
 
 # Evaluate
@@ -138,8 +132,9 @@ print(f"  Mean Absolute Error: {mae:.2f} points")
 print("\n  Feature Coefficients:")
 coef_df = pd.DataFrame({
     "feature": feature_columns,
-    "coefficient": model.coef_
-}).sort_values("coefficient", key=abs, ascending=False)
+    "coefficient": model.coef_,
+    "abs_coef": np.abs(model.coef_)
+}).sort_values("abs_coef", ascending=False)
 
 for _, row in coef_df.head(8).iterrows():
     print(f"    {row['feature']}: {row['coefficient']:.3f}")
@@ -12,9 +12,12 @@ Features:
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import nfl_data_py as nfl
+import orjson
 
 # Team mappings
 TEAM_ABBR = {
@@ -30,6 +33,17 @@ TEAM_ABBR = {
 
 PLAYOFF_TEAMS_2026 = ["HOU", "NE", "BUF", "DEN", "SF", "SEA", "LAR", "CHI"]
 
+# Play-by-play columns used by this pipeline
+PBP_COLUMNS = [
+    'posteam', 'defteam', 'epa', 'pass', 'rush', 'passing_yards', 'rushing_yards',
+    'pass_touchdown', 'rush_touchdown', 'interception', 'fumble', 'sack',
+    'game_id', 'home_team', 'away_team'
+]
+
+# Local play-by-play cache; the in-progress season is refetched once it goes stale
+PBP_CACHE_DIR = Path("data")
+PBP_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
 print("=" * 70)
 print("ENHANCED NFL ANALYSIS PIPELINE")
 print("=" * 70)
@@ -41,16 +55,35 @@ print("-" * 70)
 seasons_to_fetch = [2024, 2025]
 weights = {2024: 0.3, 2025: 0.7}  # 2025 weighted 70%, 2024 weighted 30%
 
+def load_season_plays(season):
+    """Load one season of play-by-play data, using the local parquet cache when fresh"""
+    cache_file = PBP_CACHE_DIR / f"pbp_{season}.parquet"
+    if cache_file.exists():
+        completed = season < max(seasons_to_fetch)
+        if completed or time.time() - cache_file.stat().st_mtime < PBP_CACHE_MAX_AGE:
+            try:
+                return pd.read_parquet(cache_file, columns=PBP_COLUMNS)
+            except (ValueError, KeyError):
+                pass  # Cached file lacks some of our columns; treat it as a miss and refetch
+    
+    plays = nfl.import_pbp_data([season], columns=PBP_COLUMNS)
+    PBP_CACHE_DIR.mkdir(exist_ok=True, parents=True)
+    plays.to_parquet(cache_file, compression='zstd')
+    return plays
+
+# Seasons download independently, so fetch them concurrently and collect in order
 all_plays = []
-for season in seasons_to_fetch:
-    try:
-        print(f"  Fetching {season} season data...", end=" ")
-        plays = nfl.import_pbp_data([season])
-        plays['season_weight'] = weights[season]
-        all_plays.append(plays)
-        print(f"✓ ({len(plays):,} plays)")
-    except Exception as e:
-        print(f"✗ Error: {e}")
+with ThreadPoolExecutor(max_workers=len(seasons_to_fetch)) as executor:
+    futures = {season: executor.submit(load_season_plays, season) for season in seasons_to_fetch}
+    for season, future in futures.items():
+        try:
+            print(f"  Fetching {season} season data...", end=" ")
+            plays = future.result()
+            plays['season_weight'] = weights[season]
+            all_plays.append(plays)
+            print(f"✓ ({len(plays):,} plays)")
+        except Exception as e:
+            print(f"✗ Error: {e}")
 
 combined_plays = pd.concat(all_plays, ignore_index=True) if all_plays else pd.DataFrame()
 
@@ -58,95 +91,107 @@ if combined_plays.empty:
     print("  ERROR: Could not fetch play data")
     exit(1)
 
+# Downcast: 0/1 play indicators to int8, EPA and yardage to float32
+for col in ['pass', 'rush', 'interception', 'fumble', 'sack', 'pass_touchdown', 'rush_touchdown']:
+    combined_plays[col] = combined_plays[col].fillna(0).astype('int8')
+for col in ['epa', 'passing_yards', 'rushing_yards']:
+    combined_plays[col] = combined_plays[col].astype('float32')
+
+# Team columns share one categorical dtype so comparisons and groupby keys are int codes.
+# Abbreviations outside TEAM_ABBR (e.g. nflfastR's 'LA') are kept, and categories are
+# sorted so code order matches alphabetical order.
+team_columns = ['posteam', 'defteam', 'home_team', 'away_team']
+feed_teams = set().union(*(combined_plays[col].dropna().unique() for col in team_columns))
+team_dtype = pd.CategoricalDtype(sorted(feed_teams | set(TEAM_ABBR)))
+for col in team_columns:
+    combined_plays[col] = combined_plays[col].astype(team_dtype)
+
 print(f"  Total plays loaded: {len(combined_plays):,}")
 
 # Step 2: Calculate comprehensive EPA metrics
 print("\nSTEP 2: CALCULATING EPA METRICS")
 print("-" * 70)
 
-def calculate_team_stats(plays):
-    """Calculate offensive and defensive EPA breakdowns"""
-    stats = {}
+def build_play_values(plays):
+    """Per-play stat values with the pass/rush masks applied once for both sides of the ball"""
+    is_pass = (plays['pass'] == 1).to_numpy()
+    is_rush = (plays['rush'] == 1).to_numpy()
+    epa = plays['epa'].to_numpy()
     
-    for team in TEAM_ABBR.keys():
-        # Offensive EPA (when team is on offense)
-        off_plays = plays[plays['posteam'] == team].copy()
-        off_epa = off_plays['epa'].sum() if len(off_plays) > 0 else 0
-        off_pass_epa = off_plays[off_plays['pass'] == 1]['epa'].sum() if len(off_plays) > 0 else 0
-        off_rush_epa = off_plays[off_plays['rush'] == 1]['epa'].sum() if len(off_plays) > 0 else 0
-        
-        # Defensive EPA (when team is on defense)
-        def_plays = plays[plays['defteam'] == team].copy()
-        def_epa = -def_plays['epa'].sum() if len(def_plays) > 0 else 0
-        def_pass_epa = -def_plays[def_plays['pass'] == 1]['epa'].sum() if len(def_plays) > 0 else 0
-        def_rush_epa = -def_plays[def_plays['rush'] == 1]['epa'].sum() if len(def_plays) > 0 else 0
-        
+    return pd.DataFrame({
+        'epa': epa,
+        'pass_epa': np.where(is_pass, epa, 0),
+        'rush_epa': np.where(is_rush, epa, 0),
+        'pass_yards': np.where(is_pass, plays['passing_yards'].to_numpy(), 0),
+        'rush_yards': np.where(is_rush, plays['rushing_yards'].to_numpy(), 0),
+        'pass_tds': plays['pass_touchdown'].to_numpy(),
+        'rush_tds': plays['rush_touchdown'].to_numpy(),
+        'ints': plays['interception'].to_numpy(),
+        'fumbles': plays['fumble'].to_numpy(),
+        'sacks': plays['sack'].to_numpy()
+    }, index=plays.index)
+
+def calculate_team_totals(play_values, teams):
+    """Sum every per-team play stat in a single grouped pass"""
+    grouped = play_values.groupby(teams, sort=False, observed=True)
+    return grouped.sum().assign(plays=grouped.size()).reindex(list(TEAM_ABBR), fill_value=0)
+
+# Offensive totals (when team is on offense) and defensive totals (when team is on defense)
+play_values = build_play_values(combined_plays)
+off_totals = calculate_team_totals(play_values, combined_plays['posteam'])
+def_totals = calculate_team_totals(play_values, combined_plays['defteam'])
+
+def calculate_team_stats(off, defense):
+    """Calculate offensive and defensive EPA breakdowns"""
+    stats = pd.DataFrame({
+        'off_epa': off['epa'],
         # Per-play averages
-        off_epa_per_play = off_epa / len(off_plays) if len(off_plays) > 0 else 0
-        def_epa_per_play = def_epa / len(def_plays) if len(def_plays) > 0 else 0
-        
-        stats[team] = {
-            'off_epa': float(off_epa),
-            'off_epa_per_play': float(off_epa_per_play),
-            'off_pass_epa': float(off_pass_epa),
-            'off_rush_epa': float(off_rush_epa),
-            'def_epa': float(def_epa),
-            'def_epa_per_play': float(def_epa_per_play),
-            'def_pass_epa': float(def_pass_epa),
-            'def_rush_epa': float(def_rush_epa),
-            'plays_off': int(len(off_plays)),
-            'plays_def': int(len(def_plays))
-        }
+        'off_epa_per_play': (off['epa'] / off['plays']).where(off['plays'] > 0, 0),
+        'off_pass_epa': off['pass_epa'],
+        'off_rush_epa': off['rush_epa'],
+        'def_epa': -defense['epa'],
+        'def_epa_per_play': (-defense['epa'] / defense['plays']).where(defense['plays'] > 0, 0),
+        'def_pass_epa': -defense['pass_epa'],
+        'def_rush_epa': -defense['rush_epa'],
+        'plays_off': off['plays'],
+        'plays_def': defense['plays']
+    })
     
-    return stats
+    return stats.to_dict('index')
 
-team_stats = calculate_team_stats(combined_plays)
-for team, stats in team_stats.items():
-    print(f"  {team}: Off EPA/play: {stats['off_epa_per_play']:+.3f} | Def EPA/play: {stats['def_epa_per_play']:+.3f}")
+team_stats = calculate_team_stats(off_totals, def_totals)
+sys.stdout.write("".join(
+    f"  {team}: Off EPA/play: {stats['off_epa_per_play']:+.3f} | Def EPA/play: {stats['def_epa_per_play']:+.3f}\n"
+    for team, stats in team_stats.items()
+))
 
 # Step 3: Calculate advanced statistics
 print("\nSTEP 3: CALCULATING ADVANCED STATISTICS")
 print("-" * 70)
 
-def calculate_advanced_stats(plays):
+def calculate_advanced_stats(off, defense):
     """Calculate yards, TDs, INTs, sacks, fumbles, efficiency metrics"""
-    adv_stats = {}
-    
-    for team in TEAM_ABBR.keys():
-        # Offensive stats
-        off_plays = plays[plays['posteam'] == team].copy()
-        pass_yards = off_plays[off_plays['pass'] == 1]['passing_yards'].sum() if len(off_plays) > 0 else 0
-        rush_yards = off_plays[off_plays['rush'] == 1]['rushing_yards'].sum() if len(off_plays) > 0 else 0
-        pass_tds = off_plays['pass_touchdown'].sum() if len(off_plays) > 0 else 0
-        rush_tds = off_plays['rush_touchdown'].sum() if len(off_plays) > 0 else 0
-        ints = off_plays['interception'].sum() if len(off_plays) > 0 else 0
-        fumbles = off_plays['fumble'].sum() if len(off_plays) > 0 else 0
-        
-        # Defensive stats
-        def_plays = plays[plays['defteam'] == team].copy()
-        sacks = def_plays['sack'].sum() if len(def_plays) > 0 else 0
-        def_ints = def_plays['interception'].sum() if len(def_plays) > 0 else 0
+    adv_stats = pd.DataFrame({
+        'pass_yards': off['pass_yards'],
+        'rush_yards': off['rush_yards'],
+        'pass_tds': off['pass_tds'],
+        'rush_tds': off['rush_tds'],
+        'turnovers': off['ints'] + off['fumbles'],
+        'sacks': defense['sacks'],
+        'def_ints': defense['ints'],
         # Use fumble instead of fumble_recovered (fumble lost)
-        def_fumbles = def_plays['fumble'].sum() if len(def_plays) > 0 else 0
-        
-        adv_stats[team] = {
-            'pass_yards': float(pass_yards),
-            'rush_yards': float(rush_yards),
-            'pass_tds': float(pass_tds),
-            'rush_tds': float(rush_tds),
-            'turnovers': float(ints + fumbles),
-            'sacks': float(sacks),
-            'def_ints': float(def_ints),
-            'def_fumbles': float(def_fumbles),
-            'total_yards': float(pass_yards + rush_yards),
-            'total_tds': float(pass_tds + rush_tds)
-        }
+        'def_fumbles': defense['fumbles'],
+        'total_yards': off['pass_yards'] + off['rush_yards'],
+        'total_tds': off['pass_tds'] + off['rush_tds']
+    }).astype(float)
     
-    return adv_stats
+    return adv_stats.to_dict('index')
 
-adv_stats = calculate_advanced_stats(combined_plays)
-for team, stats in adv_stats.items():
-    print(f"  {team}: {stats['total_yards']:.0f} yards | {stats['total_tds']:.0f} TDs | {stats['turnovers']:.0f} TOs")
+adv_stats = calculate_advanced_stats(off_totals, def_totals)
+sys.stdout.write("".join(
+    f"  {team}: {stats['total_yards']:.0f} yards | {stats['total_tds']:.0f} TDs | {stats['turnovers']:.0f} TOs\n"
+    for team, stats in adv_stats.items()
+))
 
 # Step 4: Head-to-head historical records
 print("\nSTEP 4: CALCULATING HEAD-TO-HEAD RECORDS")
@@ -154,31 +199,27 @@ print("-" * 70)
 
 def calculate_head_to_head(plays):
     """Calculate historical head-to-head records between teams"""
-    h2h = {}
-    
-    games = plays.drop_duplicates(subset=['game_id'])
+    games = plays.groupby('game_id', sort=False)[['home_team', 'away_team']].first().dropna()
     
-    for game_id in games['game_id']:
-        game = plays[plays['game_id'] == game_id].iloc[0]
-        home_team = game['home_team']
-        away_team = game['away_team']
-        
-        if pd.isna(home_team) or pd.isna(away_team):
-            continue
-        
-        matchup_key = tuple(sorted([home_team, away_team]))
-        
-        if matchup_key not in h2h:
-            h2h[matchup_key] = {'home_wins': 0, 'away_wins': 0, 'games': 0}
-        
-        h2h[matchup_key]['games'] += 1
+    # Order each pairing by team code (alphabetical) so home/away swaps share a key
+    teams = games['home_team'].cat.categories.tolist()
+    matchups = np.sort(np.stack([
+        games['home_team'].cat.codes.to_numpy(),
+        games['away_team'].cat.codes.to_numpy()
+    ], axis=1), axis=1)
+    matchup_codes, game_counts = np.unique(matchups, axis=0, return_counts=True)
     
-    return h2h
+    return {
+        (teams[first], teams[second]): {'home_wins': 0, 'away_wins': 0, 'games': int(count)}
+        for (first, second), count in zip(matchup_codes, game_counts)
+    }
 
 h2h = calculate_head_to_head(combined_plays)
 print(f"  Total historical matchups: {len(h2h)}")
-for (team1, team2), record in list(h2h.items())[:5]:
-    print(f"    {team1} vs {team2}: {record['games']} games")
+sys.stdout.write("".join(
+    f"    {team1} vs {team2}: {record['games']} games\n"
+    for (team1, team2), record in list(h2h.items())[:5]
+))
 
 # Step 5: Export enhanced dataset
 print("\nSTEP 5: EXPORTING ENHANCED DATA")
@@ -198,8 +239,10 @@ enhanced_data = {
     'total_plays': len(combined_plays)
 }
 
-with open(output_file, 'w') as f:
-    json.dump(enhanced_data, f, indent=2)
+output_file.write_bytes(orjson.dumps(
+    enhanced_data,
+    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+))
 
 print(f"  ✓ Exported to {output_file}")
 print(f"  Total records: {len(combined_plays):,} plays")
@@ -4,11 +4,20 @@ Fetches current injury reports from ESPN's injury tracker with accurate filterin
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
 import json
+import os
 import re
 from pathlib import Path
 from datetime import datetime
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 print("=" * 70)
 print("NFL INJURY REPORT SCRAPER")
@@ -26,8 +35,33 @@ PLAYOFF_TEAMS = {
     "CHI": "Chicago Bears"
 }
 
+# Lowercased full team name -> abbreviation for exact header matches
+_ABBR_BY_NAME = {full_name.lower(): abbr for abbr, full_name in PLAYOFF_TEAMS.items()}
+
+# Shared keep-alive session so repeated ESPN requests reuse pooled connections.
+# Responses are cached on disk for an hour; set INJURY_NOCACHE=1 to force a fresh scrape.
+SESSION = CachedSession('.cache/espn', backend='sqlite', expire_after=3600)
+if os.environ.get('INJURY_NOCACHE') == '1':
+    SESSION.cache.clear()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+})
+SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# ESPN class-name patterns, compiled once
+INJURY_SECTION_CLASS = re.compile(r'Wrapper|ResponsiveTable')
+TEAM_SECTION_CLASS = re.compile(r'TeamCard|Team')
+TEAM_HEADER_CLASS = re.compile(r'team|Team')
+
+# Per-team injury page, used for playoff teams missing from the league page
+TEAM_INJURY_URL = 'https://www.espn.com/nfl/team/injuries/_/name/{abbr}'
+
+# Only build the DOM for divs that can hold injury tables
+INJURY_PAGE_STRAINER = SoupStrainer('div', class_=re.compile(r'Wrapper|ResponsiveTable|TeamCard|Team'))
+
 # Known retired/inactive players to exclude (expanded list)
-RETIRED_PLAYERS = {
+RETIRED_PLAYERS = frozenset({
     "Rob Gronkowski",
     "Tom Brady",
     "Aaron Donald",  # Retired after 2023
@@ -35,48 +69,36 @@ RETIRED_PLAYERS = {
     "Andrew Whitworth",
     "Von Miller",  # Check status
     "Marshawn Lynch",
-}
+})
 
 # Players known to be cleared/active (updated Jan 15, 2026)
-ACTIVE_PLAYERS = {
+ACTIVE_PLAYERS = frozenset({
     "Jaylon Johnson",  # Bears CB - cleared and active
-}
+})
+
+EXCLUDED_PLAYERS = RETIRED_PLAYERS | ACTIVE_PLAYERS
 
-# Current accurate injury data (as of Jan 15, 2026)
+# Only Out, Doubtful, Questionable, IR are reported
+REPORTABLE_STATUSES = frozenset({'out', 'doubtful', 'questionable', 'ir'})
+
+# Curated injury data (as of Jan 15, 2026), used when the ESPN scrape fails.
 # This is curated from official NFL/ESPN sources
-CURRENT_INJURIES = {
-    "HOU": {
-        "team_name": "Houston Texans",
-        "key_injuries": []
-    },
-    "NE": {
-        "team_name": "New England Patriots",
-        "key_injuries": []
-    },
-    "BUF": {
-        "team_name": "Buffalo Bills",
-        "key_injuries": []
-    },
-    "DEN": {
-        "team_name": "Denver Broncos",
-        "key_injuries": []
-    },
-    "SF": {
-        "team_name": "San Francisco 49ers",
-        "key_injuries": []
-    },
-    "SEA": {
-        "team_name": "Seattle Seahawks",
-        "key_injuries": []
-    },
-    "LAR": {
-        "team_name": "Los Angeles Rams",
-        "key_injuries": []
-    },
-    "CHI": {
-        "team_name": "Chicago Bears",
-        "key_injuries": []
-    }
+CURATED_INJURIES_PATH = Path('public/data/curated_injuries.json')
+
+def load_curated_injuries():
+    """
+    Load the curated fallback injury data
+    """
+    raw = CURATED_INJURIES_PATH.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+# Map ESPN statuses to standard format
+_STATUS_MAP = {
+    'o': 'Out', 'out': 'Out',
+    'd': 'Doubtful', 'doubtful': 'Doubtful',
+    'q': 'Questionable', 'questionable': 'Questionable',
+    'ir': 'IR', 'injured reserve': 'IR',
+    'p': 'Questionable', 'probable': 'Questionable',  # Probable no longer used by NFL
 }
 
 def parse_injury_status(status_text):
@@ -89,20 +111,88 @@ def parse_injury_status(status_text):
     
     status = status_text.strip().lower()
     
-    # Map ESPN statuses to standard format
-    if 'out' in status or 'o' == status:
+    # Exact ESPN status strings first
+    mapped = _STATUS_MAP.get(status)
+    if mapped is not None:
+        return mapped
+    
+    # Fall back to substring checks for longer status strings
+    if 'out' in status:
         return 'Out'
-    elif 'doubtful' in status or 'd' == status:
+    elif 'doubtful' in status:
         return 'Doubtful'
-    elif 'questionable' in status or 'q' == status:
+    elif 'questionable' in status:
         return 'Questionable'
     elif 'ir' in status or 'injured reserve' in status:
         return 'IR'
-    elif 'probable' in status or 'p' == status:
+    elif 'probable' in status:
         return 'Questionable'  # Probable no longer used by NFL
     
     return None
 
+def parse_injury_rows(rows):
+    """
+    Parse ESPN injury table rows into injury dicts
+    """
+    team_injuries = []
+    
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) >= 3:
+            player = cols[0].get_text(strip=True)
+            position = cols[1].get_text(strip=True) if len(cols) > 1 else 'Unknown'
+            status_raw = cols[2].get_text(strip=True) if len(cols) > 2 else ''
+            reason = cols[3].get_text(strip=True) if len(cols) > 3 else 'Unlisted'
+            
+            status = parse_injury_status(status_raw)
+            
+            if status and player:
+                # Determine impact based on position and status
+                impact = 'Low'
+                if position in ['QB', 'WR', 'RB', 'TE'] and status in ['Out', 'Doubtful']:
+                    impact = 'High'
+                elif position in ['OL', 'DE', 'DT', 'LB', 'CB', 'S'] and status in ['Out', 'Doubtful']:
+                    impact = 'Medium'
+                
+                team_injuries.append({
+                    'player': player,
+                    'position': position,
+                    'status': status,
+                    'impact': impact,
+                    'reason': reason
+                })
+    
+    return team_injuries
+
+def fetch_team_injuries(team_abbr):
+    """
+    Fetch and parse a single team's ESPN injury page
+    """
+    try:
+        response = SESSION.get(TEAM_INJURY_URL.format(abbr=team_abbr.lower()), timeout=15)
+        response.raise_for_status()
+    except requests.RequestException:
+        return []
+    
+    soup = BeautifulSoup(response.content, 'lxml', parse_only=INJURY_PAGE_STRAINER)
+    team_injuries = []
+    for table in soup.find_all('table'):
+        team_injuries.extend(parse_injury_rows(table.find_all('tr')[1:]))  # Skip header
+    return team_injuries
+
+def scrape_team_injury_pages(team_abbrs):
+    """
+    Fetch per-team ESPN injury pages concurrently over the shared session
+    """
+    print(f"  Checking {len(team_abbrs)} team injury page(s)...")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(fetch_team_injuries, team_abbrs)
+        return {
+            abbr: {'team_name': PLAYOFF_TEAMS[abbr], 'key_injuries': team_injuries}
+            for abbr, team_injuries in zip(team_abbrs, results)
+            if team_injuries
+        }
+
 def scrape_espn_injuries():
     """
     Attempt to scrape injury data from ESPN with better parsing
@@ -110,73 +200,44 @@ def scrape_espn_injuries():
     try:
         print("\nAttempting to fetch from ESPN injury tracker...")
         url = "https://www.espn.com/nfl/injuries"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
         
-        response = requests.get(url, headers=headers, timeout=15)
+        response = SESSION.get(url, timeout=15)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=INJURY_PAGE_STRAINER)
         
         injuries_data = {}
         
         # ESPN uses different layouts - try multiple selectors
         # Method 1: Look for ResponsiveTable components
-        injury_sections = soup.find_all('div', class_=re.compile('Wrapper|ResponsiveTable'))
+        injury_sections = soup.find_all('div', class_=INJURY_SECTION_CLASS)
         
         # Method 2: Look for team sections
         if not injury_sections:
-            injury_sections = soup.find_all('div', class_=re.compile('TeamCard|Team'))
+            injury_sections = soup.find_all('div', class_=TEAM_SECTION_CLASS)
         
         if injury_sections:
             print(f"  ✓ Found {len(injury_sections)} potential injury sections")
             
             for section in injury_sections:
                 # Try to find team name
-                team_header = section.find(['h2', 'h3', 'div'], class_=re.compile('team|Team'))
+                team_header = section.find(['h2', 'h3', 'div'], class_=TEAM_HEADER_CLASS)
                 if team_header:
                     team_name = team_header.get_text(strip=True)
                     
-                    # Find matching team abbreviation
-                    team_abbr = None
-                    for abbr, full_name in PLAYOFF_TEAMS.items():
-                        if full_name in team_name or team_name in full_name:
-                            team_abbr = abbr
-                            break
+                    # Find matching team abbreviation, falling back to a substring scan
+                    team_abbr = _ABBR_BY_NAME.get(team_name.lower())
+                    if team_abbr is None:
+                        for abbr, full_name in PLAYOFF_TEAMS.items():
+                            if full_name in team_name or team_name in full_name:
+                                team_abbr = abbr
+                                break
                     
                     if not team_abbr:
                         continue
                     
                     # Parse injury rows
-                    rows = section.find_all('tr')[1:]  # Skip header
-                    team_injuries = []
-                    
-                    for row in rows:
-                        cols = row.find_all('td')
-                        if len(cols) >= 3:
-                            player = cols[0].get_text(strip=True)
-                            position = cols[1].get_text(strip=True) if len(cols) > 1 else 'Unknown'
-                            status_raw = cols[2].get_text(strip=True) if len(cols) > 2 else ''
-                            reason = cols[3].get_text(strip=True) if len(cols) > 3 else 'Unlisted'
-                            
-                            status = parse_injury_status(status_raw)
-                            
-                            if status and player:
-                                # Determine impact based on position and status
-                                impact = 'Low'
-                                if position in ['QB', 'WR', 'RB', 'TE'] and status in ['Out', 'Doubtful']:
-                                    impact = 'High'
-                                elif position in ['OL', 'DE', 'DT', 'LB', 'CB', 'S'] and status in ['Out', 'Doubtful']:
-                                    impact = 'Medium'
-                                
-                                team_injuries.append({
-                                    'player': player,
-                                    'position': position,
-                                    'status': status,
-                                    'impact': impact,
-                                    'reason': reason
-                                })
+                    team_injuries = parse_injury_rows(section.find_all('tr')[1:])  # Skip header
                     
                     if team_abbr and team_injuries:
                         injuries_data[team_abbr] = {
@@ -184,6 +245,11 @@ def scrape_espn_injuries():
                             'key_injuries': team_injuries
                         }
             
+            # Fill in teams the league page did not list from their own pages
+            missing_teams = [abbr for abbr in PLAYOFF_TEAMS if abbr not in injuries_data]
+            if missing_teams:
+                injuries_data.update(scrape_team_injury_pages(missing_teams))
+            
             if injuries_data:
                 print(f"  ✓ Successfully parsed injuries for {len(injuries_data)} teams")
                 return injuries_data
@@ -207,32 +273,18 @@ def filter_injuries(injuries):
     """
     Filter out retired players, active players, and validate injury status
     """
-    filtered = []
     for injury in injuries:
         player = injury.get('player', '')
-        
-        # Skip retired players
         if player in RETIRED_PLAYERS:
             print(f"    ⊘ Skipping retired player: {player}")
-            continue
-        
-        # Skip players confirmed as active/cleared
-        if player in ACTIVE_PLAYERS:
+        elif player in ACTIVE_PLAYERS:
             print(f"    ⊘ Skipping active player: {player}")
-            continue
-        
-        # Skip if status is invalid or active
-        status = injury.get('status', '').lower()
-        if status in ['active', 'healthy', 'probable', '']:
-            continue
-        
-        # Only include Out, Doubtful, Questionable, IR
-        if status not in ['out', 'doubtful', 'questionable', 'ir']:
-            continue
-            
-        filtered.append(injury)
     
-    return filtered
+    return [
+        injury for injury in injuries
+        if injury.get('player', '') not in EXCLUDED_PLAYERS
+        and injury.get('status', '').lower() in REPORTABLE_STATUSES
+    ]
 
 # Step 1: Try scraping
 print("\nSTEP 1: FETCHING INJURY REPORTS")
@@ -245,7 +297,7 @@ if scraped_data:
 else:
     print("  ⚠ Using curated injury data (verified for Jan 15, 2026)")
     print("  ℹ For most accurate data, visit https://www.espn.com/nfl/injuries")
-    injury_data = CURRENT_INJURIES
+    injury_data = load_curated_injuries()
 
 # Step 2: Validate and filter
 print("\nSTEP 2: VALIDATING AND FILTERING DATA")
@@ -320,8 +372,13 @@ output_path = Path('public/data')
 output_path.mkdir(parents=True, exist_ok=True)
 
 # Write injury report
-with open(output_path / 'injury_report.json', 'w') as f:
-    json.dump(injury_report, f, indent=2)
+if orjson is not None:
+    (output_path / 'injury_report.json').write_bytes(
+        orjson.dumps(injury_report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    )
+else:
+    with open(output_path / 'injury_report.json', 'w') as f:
+        json.dump(injury_report, f, indent=2)
 
 print(f"  ✓ Exported to public/data/injury_report.json")
 
@@ -4,20 +4,28 @@ Compares model predictions against Vegas lines to find betting edges.
 """
 
 import pandas as pd
-import pickle
+import numpy as np
+import importlib
 from pathlib import Path
 
+analysis_utils = importlib.import_module("04_analysis_utils")
+
 data_dir = Path("data")
 models_dir = Path("models")
 
+# Column types for the Vegas lines CSV, so nothing is inferred on load
+VEGAS_DTYPES = {
+    "game_id": "int32",
+    "home_team": "category",
+    "away_team": "category",
+    "vegas_total": "float32"
+}
+
 # ============================================================================
 # Load the trained model
 # ============================================================================
 print("Loading trained model...")
-with open(models_dir / "total_points_model.pkl", "rb") as f:
-    model_data = pickle.load(f)
-
-model = model_data["model"]
+model, model_data = analysis_utils.load_model(models_dir / "total_points_model.pkl")
 feature_columns = model_data["feature_columns"]
 print(f"  ✓ Model loaded (R²: {model_data['r2_score']:.4f}, MAE: {model_data['mae']:.2f})")
 
@@ -26,97 +34,30 @@ print(f"  ✓ Model loaded (R²: {model_data['r2_score']:.4f}, MAE: {model_data[
 # ============================================================================
 print("\nLoading team metrics and Vegas lines...")
 
-team_epa_df = pd.read_csv(data_dir / "team_epa_2025.csv")
-team_points_df = pd.read_csv(data_dir / "team_points_2025.csv")
-vegas_df = pd.read_csv(data_dir / "vegas_lines_divisional.csv")
+team_epa_df, team_points_df = analysis_utils.load_team_metrics(data_dir, 2025)
+vegas_df = pd.read_csv(data_dir / "vegas_lines_divisional.csv", dtype=VEGAS_DTYPES, engine="pyarrow")
 
 print(f"  ✓ Loaded {len(vegas_df)} divisional round matchups")
 
-# Join home team EPA metrics
-playoff_features_df = vegas_df.merge(
-    team_epa_df.rename(columns={
-        "off_epa_per_play": "home_off_epa",
-        "off_pass_epa": "home_off_pass_epa",
-        "off_rush_epa": "home_off_rush_epa",
-        "def_epa_per_play": "home_def_epa",
-        "def_pass_epa": "home_def_pass_epa",
-        "def_rush_epa": "home_def_rush_epa"
-    }),
-    left_on="home_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Join away team EPA metrics
-playoff_features_df = playoff_features_df.merge(
-    team_epa_df.rename(columns={
-        "off_epa_per_play": "away_off_epa",
-        "off_pass_epa": "away_off_pass_epa",
-        "off_rush_epa": "away_off_rush_epa",
-        "def_epa_per_play": "away_def_epa",
-        "def_pass_epa": "away_def_pass_epa",
-        "def_rush_epa": "away_def_rush_epa"
-    }),
-    left_on="away_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Join home team points metrics
-playoff_features_df = playoff_features_df.merge(
-    team_points_df.rename(columns={
-        "points_per_play": "home_points_per_play",
-        "points_per_play_home": "home_ppp_at_home",
-        "points_per_play_away": "home_ppp_on_road",
-        "plays_per_game": "home_plays_per_game"
-    }),
-    left_on="home_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Join away team points metrics
-playoff_features_df = playoff_features_df.merge(
-    team_points_df.rename(columns={
-        "points_per_play": "away_points_per_play",
-        "points_per_play_home": "away_ppp_at_home",
-        "points_per_play_away": "away_ppp_on_road",
-        "plays_per_game": "away_plays_per_game"
-    }),
-    left_on="away_team",
-    right_on="team",
-    how="left"
-).drop(columns=["team"])
-
-# Compute derived features
-playoff_features_df["off_epa_diff"] = playoff_features_df["home_off_epa"] - playoff_features_df["away_off_epa"]
-playoff_features_df["def_epa_diff"] = playoff_features_df["home_def_epa"] - playoff_features_df["away_def_epa"]
-playoff_features_df["ppp_diff"] = playoff_features_df["home_points_per_play"] - playoff_features_df["away_points_per_play"]
-playoff_features_df["home_matchup_edge"] = playoff_features_df["home_off_epa"] - playoff_features_df["away_def_epa"]
-playoff_features_df["away_matchup_edge"] = playoff_features_df["away_off_epa"] - playoff_features_df["home_def_epa"]
+# Join home and away team metrics and matchup features
+playoff_features_df = analysis_utils.join_team_metrics(vegas_df, team_epa_df, team_points_df)
 
 # ============================================================================
 # F. Compare model projections vs Vegas totals
 # ============================================================================
 print("\nGenerating model projections...")
 
-# Extract features for prediction
-X_future = playoff_features_df[feature_columns]
+# Extract features for prediction (same float32 layout the model was trained on)
+X_future = np.ascontiguousarray(playoff_features_df[feature_columns].to_numpy(dtype=np.float32))
 
-# Predict totals
-playoff_features_df["model_total"] = model.predict(X_future)
+# Predict totals from the fitted coefficients directly (skips sklearn's per-call validation)
+coef = np.ascontiguousarray(model.coef_, dtype=np.float32)
+playoff_features_df["model_total"] = X_future @ coef + np.float32(model.intercept_)
 playoff_features_df["difference"] = playoff_features_df["model_total"] - playoff_features_df["vegas_total"]
 
 # Determine betting signal
-def get_signal(diff):
-    if diff > 2:
-        return "OVER"
-    elif diff < -2:
-        return "UNDER"
-    else:
-        return "NO EDGE"
-
-playoff_features_df["signal"] = playoff_features_df["difference"].apply(get_signal)
+diff = playoff_features_df["difference"].to_numpy()
+playoff_features_df["signal"] = np.select([diff > 2, diff < -2], ["OVER", "UNDER"], default="NO EDGE")
 
 # ============================================================================
 # Display Results
@@ -126,11 +67,13 @@ print("DIVISIONAL ROUND - MODEL vs VEGAS TOTALS")
 print("=" * 70)
 
 results = playoff_features_df[["home_team", "away_team", "model_total", "vegas_total", "difference", "signal"]]
-results = results.copy()
-results["model_total"] = results["model_total"].round(1)
-results["difference"] = results["difference"].round(1)
 
-print(results.to_string(index=False))
+# Totals are rounded to one decimal by the format spec rather than a rounded copy
+header_format = "{:>9} {:>9} {:>11} {:>11} {:>10} {:>7}\n"
+row_format = "{:>9} {:>9} {:>11.1f} {:>11.1f} {:>10.1f} {:>7}\n"
+print(header_format.format(*results.columns) + "".join(
+    row_format.format(*row) for row in results.itertuples(index=False, name=None)
+), end="")
 
 print("\n" + "-" * 70)
 print("INTERPRETATION:")
@@ -140,5 +83,5 @@ print("  |difference| > 2 points = potential betting edge")
 print("-" * 70)
 
 # Save results
-results.to_csv(data_dir / "projections_divisional.csv", index=False)
+results.to_csv(data_dir / "projections_divisional.csv", index=False, float_format="%.1f")
 print(f"\n✓ Projections saved to {data_dir / 'projections_divisional.csv'}")
@@ -4,9 +4,11 @@ Wrap key steps into reusable functions for weekly/round updates.
 """
 
 import pandas as pd
+import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score, mean_absolute_error
 import pickle
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, Dict, Any
 
@@ -20,89 +22,130 @@ DEFAULT_FEATURES = [
     "home_matchup_edge", "away_matchup_edge"
 ]
 
+# Team metric columns renamed to their feature names before prefixing
+TEAM_METRIC_RENAMES = {
+    "off_epa_per_play": "off_epa",
+    "def_epa_per_play": "def_epa",
+    "points_per_play_home": "ppp_at_home",
+    "points_per_play_away": "ppp_on_road"
+}
 
-def build_training_data(
+
+def _join_team_metrics(games: pd.DataFrame, metrics: pd.DataFrame, side: str) -> pd.DataFrame:
+    return games.join(metrics.add_prefix(f"{side}_"), on=f"{side}_team")
+
+
+def join_team_metrics(
+    games_df: pd.DataFrame,
+    team_epa_df: pd.DataFrame,
+    team_points_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Attach home_* and away_* team EPA and points metrics to each game,
+    plus the derived diff and matchup-edge features.
+    
+    Args:
+        games_df: DataFrame with home_team, away_team columns
+        team_epa_df: Team EPA metrics
+        team_points_df: Team points per play metrics
+        
+    Returns:
+        games_df with prefixed team metric and matchup feature columns appended
+    """
+    metrics = (
+        team_epa_df.set_index("team")
+        .join(team_points_df.set_index("team"))
+        .rename(columns=TEAM_METRIC_RENAMES)
+    )
+    result = _join_team_metrics(games_df, metrics, "home")
+    result = _join_team_metrics(result, metrics, "away")
+    
+    # Derived matchup features, gathered from per-team vectors. The trailing
+    # NaN slot is what get_indexer's -1 hits for teams without metrics.
+    home = metrics.index.get_indexer(games_df["home_team"])
+    away = metrics.index.get_indexer(games_df["away_team"])
+    off_epa, def_epa, ppp = (
+        np.append(metrics[col].to_numpy(dtype=np.float64), np.nan)
+        for col in ("off_epa", "def_epa", "points_per_play")
+    )
+    return result.assign(
+        off_epa_diff=off_epa[home] - off_epa[away],
+        def_epa_diff=def_epa[home] - def_epa[away],
+        ppp_diff=ppp[home] - ppp[away],
+        home_matchup_edge=off_epa[home] - def_epa[away],
+        away_matchup_edge=off_epa[away] - def_epa[home]
+    )
+
+
+@lru_cache(maxsize=8)
+def _read_parquet_cached(path: str, mtime_ns: int) -> pd.DataFrame:
+    return pd.read_parquet(path)
+
+
+def load_parquet(path: Path) -> pd.DataFrame:
+    """Read a Parquet file, reusing the parsed frame until the file changes."""
+    path = Path(path)
+    return _read_parquet_cached(str(path), path.stat().st_mtime_ns).copy()
+
+
+def load_team_metrics(
     data_dir: Path,
     season: int = 2025
-) -> pd.DataFrame:
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Load CSVs and build game_features table for a given season.
+    Load team EPA and points metrics for a given season.
     
     Args:
-        data_dir: Path to directory containing CSV files
+        data_dir: Path to directory containing Parquet files
         season: Season year
         
     Returns:
-        DataFrame with all game features ready for modeling
+        Tuple of (team_epa_df, team_points_df)
     """
-    # Load CSVs
-    team_epa_df = pd.read_csv(data_dir / f"team_epa_{season}.csv")
-    team_points_df = pd.read_csv(data_dir / f"team_points_{season}.csv")
-    games_df = pd.read_csv(data_dir / f"games_{season}.csv")
-    
-    # Join home team EPA metrics
-    result = games_df.merge(
-        team_epa_df.rename(columns={
-            "off_epa_per_play": "home_off_epa",
-            "off_pass_epa": "home_off_pass_epa",
-            "off_rush_epa": "home_off_rush_epa",
-            "def_epa_per_play": "home_def_epa",
-            "def_pass_epa": "home_def_pass_epa",
-            "def_rush_epa": "home_def_rush_epa"
-        }),
-        left_on="home_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join away team EPA metrics
-    result = result.merge(
-        team_epa_df.rename(columns={
-            "off_epa_per_play": "away_off_epa",
-            "off_pass_epa": "away_off_pass_epa",
-            "off_rush_epa": "away_off_rush_epa",
-            "def_epa_per_play": "away_def_epa",
-            "def_pass_epa": "away_def_pass_epa",
-            "def_rush_epa": "away_def_rush_epa"
-        }),
-        left_on="away_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join home team points metrics
-    result = result.merge(
-        team_points_df.rename(columns={
-            "points_per_play": "home_points_per_play",
-            "plays_per_game": "home_plays_per_game"
-        }),
-        left_on="home_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
+    data_dir = Path(data_dir)
+    return (
+        load_parquet(data_dir / f"team_epa_{season}.parquet"),
+        load_parquet(data_dir / f"team_points_{season}.parquet")
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_training_data_cached(data_dir: str, season: int, mtimes: tuple) -> pd.DataFrame:
+    data_dir = Path(data_dir)
+    team_epa_df, team_points_df = load_team_metrics(data_dir, season)
+    games_df = load_parquet(data_dir / f"games_{season}.parquet")
     
-    # Join away team points metrics
-    result = result.merge(
-        team_points_df.rename(columns={
-            "points_per_play": "away_points_per_play",
-            "plays_per_game": "away_plays_per_game"
-        }),
-        left_on="away_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
+    # Join home and away team metrics and matchup features
+    result = join_team_metrics(games_df, team_epa_df, team_points_df)
     
-    # Compute derived features
     result["total_points"] = result["home_score"] + result["away_score"]
-    result["off_epa_diff"] = result["home_off_epa"] - result["away_off_epa"]
-    result["def_epa_diff"] = result["home_def_epa"] - result["away_def_epa"]
-    result["ppp_diff"] = result["home_points_per_play"] - result["away_points_per_play"]
-    result["home_matchup_edge"] = result["home_off_epa"] - result["away_def_epa"]
-    result["away_matchup_edge"] = result["away_off_epa"] - result["home_def_epa"]
     
     return result.sort_values(["week", "game_id"]).reset_index(drop=True)
 
 
+def build_training_data(
+    data_dir: Path,
+    season: int = 2025
+) -> pd.DataFrame:
+    """
+    Load Parquet files and build game_features table for a given season.
+    Results are cached until one of the input files changes.
+    
+    Args:
+        data_dir: Path to directory containing Parquet files
+        season: Season year
+        
+    Returns:
+        DataFrame with all game features ready for modeling
+    """
+    data_dir = Path(data_dir)
+    mtimes = tuple(
+        (data_dir / f"{name}_{season}.parquet").stat().st_mtime_ns
+        for name in ("team_epa", "team_points", "games")
+    )
+    return _build_training_data_cached(str(data_dir), season, mtimes).copy()
+
+
 def fit_total_model(
     training_df: pd.DataFrame,
     feature_columns: list = None
@@ -170,79 +213,22 @@ def project_week(
         how="left"
     )
     
-    # Join home team EPA metrics
-    result = games_with_lines.merge(
-        team_epa_df.rename(columns={
-            "off_epa_per_play": "home_off_epa",
-            "off_pass_epa": "home_off_pass_epa",
-            "off_rush_epa": "home_off_rush_epa",
-            "def_epa_per_play": "home_def_epa",
-            "def_pass_epa": "home_def_pass_epa",
-            "def_rush_epa": "home_def_rush_epa"
-        }),
-        left_on="home_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join away team EPA metrics
-    result = result.merge(
-        team_epa_df.rename(columns={
-            "off_epa_per_play": "away_off_epa",
-            "off_pass_epa": "away_off_pass_epa",
-            "off_rush_epa": "away_off_rush_epa",
-            "def_epa_per_play": "away_def_epa",
-            "def_pass_epa": "away_def_pass_epa",
-            "def_rush_epa": "away_def_rush_epa"
-        }),
-        left_on="away_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join home team points metrics
-    result = result.merge(
-        team_points_df.rename(columns={
-            "points_per_play": "home_points_per_play",
-            "plays_per_game": "home_plays_per_game"
-        }),
-        left_on="home_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join away team points metrics
-    result = result.merge(
-        team_points_df.rename(columns={
-            "points_per_play": "away_points_per_play",
-            "plays_per_game": "away_plays_per_game"
-        }),
-        left_on="away_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Compute derived features
-    result["off_epa_diff"] = result["home_off_epa"] - result["away_off_epa"]
-    result["def_epa_diff"] = result["home_def_epa"] - result["away_def_epa"]
-    result["ppp_diff"] = result["home_points_per_play"] - result["away_points_per_play"]
-    result["home_matchup_edge"] = result["home_off_epa"] - result["away_def_epa"]
-    result["away_matchup_edge"] = result["away_off_epa"] - result["home_def_epa"]
+    # Join home and away team metrics and matchup features
+    result = join_team_metrics(games_with_lines, team_epa_df, team_points_df)
     
-    # Predict
-    X = result[feature_columns]
-    result["model_total"] = model.predict(X)
+    # Predict by applying the fitted coefficients directly (skips sklearn's per-call validation)
+    X = result[feature_columns].to_numpy(dtype=np.float32)
+    coef = np.ascontiguousarray(model.coef_, dtype=np.float32)
+    result["model_total"] = X @ coef + np.float32(model.intercept_)
     result["difference"] = result["model_total"] - result["vegas_total"]
     
     # Signal
-    def get_signal(diff):
-        if diff > edge_threshold:
-            return "OVER"
-        elif diff < -edge_threshold:
-            return "UNDER"
-        return "NO EDGE"
-    
-    result["signal"] = result["difference"].apply(get_signal)
+    diff = result["difference"].to_numpy()
+    result["signal"] = np.select(
+        [diff > edge_threshold, diff < -edge_threshold],
+        ["OVER", "UNDER"],
+        default="NO EDGE"
+    )
     
     return result[["home_team", "away_team", "model_total", "vegas_total", "difference", "signal"]]
 
@@ -254,9 +240,15 @@ def save_model(model: LinearRegression, metrics: dict, path: Path):
         pickle.dump(data, f)
 
 
-def load_model(path: Path) -> Tuple[LinearRegression, dict]:
-    """Load model and metadata from pickle file."""
+@lru_cache(maxsize=4)
+def _load_model_cached(path: str, mtime_ns: int) -> dict:
     with open(path, "rb") as f:
-        data = pickle.load(f)
+        return pickle.load(f)
+
+
+def load_model(path: Path) -> Tuple[LinearRegression, dict]:
+    """Load model and metadata from pickle file, cached until the file changes."""
+    path = Path(path)
+    data = dict(_load_model_cached(str(path), path.stat().st_mtime_ns))
     model = data.pop("model")
     return model, data
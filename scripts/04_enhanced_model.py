@@ -5,10 +5,11 @@ Uses EPA metrics, advanced stats, head-to-head records, and injury adjustments
 
 import pandas as pd
 import numpy as np
-import json
+import orjson
 from pathlib import Path
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
+from team_table import build_team_table, lookup_team_ids
 from datetime import datetime
 
 print("=" * 70)
@@ -19,14 +20,11 @@ print("=" * 70)
 print("\nSTEP 1: LOADING ENHANCED DATA")
 print("-" * 70)
 
-with open('public/data/enhanced_analysis.json', 'r') as f:
-    enhanced_data = json.load(f)
+enhanced_data = orjson.loads(Path('public/data/enhanced_analysis.json').read_bytes())
 
-with open('public/data/injury_report.json', 'r') as f:
-    injury_report = json.load(f)
+injury_report = orjson.loads(Path('public/data/injury_report.json').read_bytes())
 
-with open('public/data/nfl_analysis.json', 'r') as f:
-    current_analysis = json.load(f)
+current_analysis = orjson.loads(Path('public/data/nfl_analysis.json').read_bytes())
 
 print(f"  ✓ Loaded enhanced stats for {len(enhanced_data['team_stats'])} teams")
 print(f"  ✓ Loaded injury report with {len(injury_report['advisory']['high_impact'])} high-impact injuries")
@@ -35,68 +33,81 @@ print(f"  ✓ Loaded injury report with {len(injury_report['advisory']['high_imp
 print("\nSTEP 2: PREPARING FEATURE MATRIX")
 print("-" * 70)
 
-features_list = []
-targets = []
+# Feature matrix columns, in gather order
+FEATURE_COLS = (
+    # Offensive EPA (passing vs rushing)
+    'away_off_epa', 'home_off_epa', 'away_pass_epa', 'away_rush_epa', 'home_pass_epa', 'home_rush_epa',
+    # Defensive EPA
+    'away_def_epa', 'home_def_epa',
+    # Advanced stats
+    'away_pass_yards', 'home_pass_yards', 'away_rush_yards', 'home_rush_yards',
+    'away_turnovers', 'home_turnovers',
+    # Injury adjustment (reduce offensive EPA if high-impact injuries)
+    'away_injury_factor', 'home_injury_factor',
+)
 
 # Use play-by-play data to generate synthetic training examples
-team_stats = enhanced_data['team_stats']
+team_ids, team_table = build_team_table(
+    enhanced_data['team_stats'],
+    ('off_epa_per_play', 'off_pass_epa', 'off_rush_epa', 'def_epa_per_play')
+)
+adv_team_ids, adv_table = build_team_table(
+    enhanced_data['advanced_stats'],
+    ('pass_yards', 'rush_yards', 'turnovers')
+)
+
+# Injury adjustment per team (15% reduction per high-impact skill-position injury)
+SKILL_POSITIONS = frozenset(('WR', 'RB', 'TE'))
+injury_factors = {}
+for injury in injury_report['advisory'].get('high_impact', []):
+    if injury['position'] in SKILL_POSITIONS:
+        injury_factors[injury['team']] = injury_factors.get(injury['team'], 1.0) * 0.85
+
+training_games = []
+targets = []
 
 for game in current_analysis['games']:
-    away_team = game['awayAbbr']
-    home_team = game['homeAbbr']
-    
     # Use actual game total as target (not Vegas line!)
     actual_total = game.get('homeScore', 0) + game.get('awayScore', 0)
-    vegas_total = game['vegasTotal']
     
     # Skip if no actual game data available
     if actual_total == 0:
         print(f"  ⚠ Skipping {game['awayTeam']} @ {game['homeTeam']}: No actual game scores")
         continue
     
-    # Extract features
-    away_stats = team_stats.get(away_team, {})
-    home_stats = team_stats.get(home_team, {})
-    
-    # Build feature vector (more advanced than before)
-    features = {
-        # Offensive EPA (passing vs rushing)
-        'away_off_epa': away_stats.get('off_epa_per_play', 0),
-        'home_off_epa': home_stats.get('off_epa_per_play', 0),
-        'away_pass_epa': away_stats.get('off_pass_epa', 0),
-        'away_rush_epa': away_stats.get('off_rush_epa', 0),
-        'home_pass_epa': home_stats.get('off_pass_epa', 0),
-        'home_rush_epa': home_stats.get('off_rush_epa', 0),
-        
-        # Defensive EPA
-        'away_def_epa': away_stats.get('def_epa_per_play', 0),
-        'home_def_epa': home_stats.get('def_epa_per_play', 0),
-        
-        # Advanced stats
-        'away_pass_yards': enhanced_data['advanced_stats'].get(away_team, {}).get('pass_yards', 0),
-        'home_pass_yards': enhanced_data['advanced_stats'].get(home_team, {}).get('pass_yards', 0),
-        'away_rush_yards': enhanced_data['advanced_stats'].get(away_team, {}).get('rush_yards', 0),
-        'home_rush_yards': enhanced_data['advanced_stats'].get(home_team, {}).get('rush_yards', 0),
-        'away_turnovers': enhanced_data['advanced_stats'].get(away_team, {}).get('turnovers', 0),
-        'home_turnovers': enhanced_data['advanced_stats'].get(home_team, {}).get('turnovers', 0),
-        
-        # Injury adjustment (reduce offensive EPA if high-impact injuries)
-        'away_injury_factor': 1.0,
-        'home_injury_factor': 1.0
-    }
-    
-    # Apply injury adjustments
-    for injury in injury_report['advisory'].get('high_impact', []):
-        if injury['team'] == away_team and injury['position'] in ['WR', 'RB', 'TE']:
-            features['away_injury_factor'] *= 0.85  # 15% reduction for skill position
-        if injury['team'] == home_team and injury['position'] in ['WR', 'RB', 'TE']:
-            features['home_injury_factor'] *= 0.85
-    
-    features_list.append(features)
+    training_games.append(game)
     targets.append(actual_total)
 
-# Convert to DataFrame
-features_df = pd.DataFrame(features_list)
+away_teams = [game['awayAbbr'] for game in training_games]
+home_teams = [game['homeAbbr'] for game in training_games]
+away_ids = lookup_team_ids(team_ids, away_teams)
+home_ids = lookup_team_ids(team_ids, home_teams)
+away_adv_ids = lookup_team_ids(adv_team_ids, away_teams)
+home_adv_ids = lookup_team_ids(adv_team_ids, home_teams)
+
+# Gather each feature column in FEATURE_COLS order (teams without stats get the all-zero
+# row and missing fields read as 0; only explicit nulls in the JSON come through as NaN)
+X = np.column_stack((
+    team_table['off_epa_per_play'][away_ids],
+    team_table['off_epa_per_play'][home_ids],
+    team_table['off_pass_epa'][away_ids],
+    team_table['off_rush_epa'][away_ids],
+    team_table['off_pass_epa'][home_ids],
+    team_table['off_rush_epa'][home_ids],
+    team_table['def_epa_per_play'][away_ids],
+    team_table['def_epa_per_play'][home_ids],
+    adv_table['pass_yards'][away_adv_ids],
+    adv_table['pass_yards'][home_adv_ids],
+    adv_table['rush_yards'][away_adv_ids],
+    adv_table['rush_yards'][home_adv_ids],
+    adv_table['turnovers'][away_adv_ids],
+    adv_table['turnovers'][home_adv_ids],
+    np.array([injury_factors.get(team, 1.0) for team in away_teams]),
+    np.array([injury_factors.get(team, 1.0) for team in home_teams]),
+))
+
+# DataFrame view is only used for the printed summary
+features_df = pd.DataFrame(X, columns=FEATURE_COLS)
 
 print(f"  Features collected: {len(features_df)}")
 print(f"  Feature columns: {len(features_df.columns)}")
@@ -108,23 +119,24 @@ for col in features_df.columns[:5]:
 print("\nSTEP 3: TRAINING ENHANCED MODEL")
 print("-" * 70)
 
-# Handle any NaN values
-features_df = features_df.fillna(0)
+# Zero out the NaNs from explicit nulls in the stats JSON
+X[np.isnan(X)] = 0
+y = np.asarray(targets, dtype=np.float64)
 
 # Standardize features
 scaler = StandardScaler()
-features_scaled = scaler.fit_transform(features_df)
+features_scaled = scaler.fit_transform(X)
 
 # Train model
 model = LinearRegression()
-model.fit(features_scaled, targets)
+model.fit(features_scaled, y)
 
 # Calculate metrics
 y_pred = model.predict(features_scaled)
-mse = np.mean((y_pred - targets) ** 2)
+mse = np.mean((y_pred - y) ** 2)
 rmse = np.sqrt(mse)
-mae = np.mean(np.abs(y_pred - targets))
-r2 = model.score(features_scaled, targets)
+mae = np.mean(np.abs(y_pred - y))
+r2 = model.score(features_scaled, y)
 
 print(f"  Model Metrics:")
 print(f"    R² Score: {r2:.4f}")
@@ -133,7 +145,7 @@ print(f"    RMSE: {rmse:.2f} points")
 
 # Feature importance
 feature_importance = pd.DataFrame({
-    'feature': features_df.columns,
+    'feature': FEATURE_COLS,
     'coefficient': np.abs(model.coef_)
 }).sort_values('coefficient', ascending=False)
 
@@ -145,29 +157,33 @@ for idx, row in feature_importance.head(5).iterrows():
 print("\nSTEP 4: UPDATING PREDICTIONS")
 print("-" * 70)
 
-# Make predictions for current games
-predictions = []
-for i, game in enumerate(current_analysis['games']):
-    pred_total = y_pred[i]
-    
-    prediction = {
+# Make predictions for current games (the ones the model was fit on)
+vegas_totals = np.fromiter((game['vegasTotal'] for game in training_games), dtype=np.float64)
+edges = y_pred - vegas_totals
+recommendations = np.where(edges > 1, 'over', np.where(edges < -1, 'under', 'hold'))
+
+predictions = [
+    {
         'game': f"{game['awayTeam']} @ {game['homeTeam']}",
         'away_team': game['awayAbbr'],
         'home_team': game['homeAbbr'],
         'vegas_total': game['vegasTotal'],
-        'model_total': float(pred_total),
-        'edge': float(pred_total - game['vegasTotal']),
-        'recommendation': 'over' if pred_total > game['vegasTotal'] + 1 else 'under' if pred_total < game['vegasTotal'] - 1 else 'hold'
+        'model_total': pred_total,
+        'edge': edge,
+        'recommendation': recommendation
     }
-    predictions.append(prediction)
-    print(f"  {prediction['game']}: Model {pred_total:.1f} vs Vegas {game['vegasTotal']} (Edge: {prediction['edge']:+.1f})")
+    # tolist() hands plain Python floats/strs to the JSON output
+    for game, pred_total, edge, recommendation in zip(training_games, y_pred.tolist(), edges.tolist(), recommendations.tolist())
+]
+for prediction in predictions:
+    print(f"  {prediction['game']}: Model {prediction['model_total']:.1f} vs Vegas {prediction['vegas_total']} (Edge: {prediction['edge']:+.1f})")
 
 # Export model metadata
 model_data = {
     'generated_at': datetime.now().isoformat(),
     'model_type': 'Enhanced Linear Regression',
-    'features': len(features_df.columns),
-    'training_samples': len(features_df),
+    'features': len(FEATURE_COLS),
+    'training_samples': len(X),
     'metrics': {
         'r2_score': float(r2),
         'mae': float(mae),
@@ -183,8 +199,10 @@ model_data = {
     'predictions': predictions
 }
 
-with open('public/data/enhanced_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
+Path('public/data/enhanced_model.json').write_bytes(orjson.dumps(
+    model_data,
+    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+))
 
 print(f"\n  ✓ Model exported to public/data/enhanced_model.json")
 
@@ -5,13 +5,44 @@ Trains model on 2022-2024 regular season games with proper train/test split
 
 import pandas as pd
 import numpy as np
-import json
+import orjson
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
+from sklearn.linear_model import Ridge
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from datetime import datetime
 
+# Play-by-play fields used by the game-level aggregation
+PBP_COLUMNS = [
+    'game_id', 'home_team', 'away_team', 'home_score', 'away_score',
+    'posteam', 'play_type', 'epa', 'yards_gained', 'interception', 'fumble_lost'
+]
+PBP_CATEGORY_COLUMNS = ['game_id', 'home_team', 'away_team', 'posteam', 'play_type']
+PBP_FLAG_COLUMNS = ['interception', 'fumble_lost']
+# Scores stay float so unfinished games keep NaN (float32 is exact for scores)
+PBP_NUMERIC_DTYPES = {
+    'epa': 'float32', 'yards_gained': 'float32',
+    'home_score': 'float32', 'away_score': 'float32',
+    'interception': 'int8', 'fumble_lost': 'int8',
+}
+PBP_CACHE_DIR = Path("data")
+
+
+def load_pbp_data(seasons):
+    """Load play-by-play data for completed seasons, using the local parquet cache when present"""
+    cache_file = PBP_CACHE_DIR / f"pbp_history_{min(seasons)}_{max(seasons)}.parquet"
+    if cache_file.exists():
+        return pd.read_parquet(cache_file, columns=PBP_COLUMNS)
+    
+    plays = nfl.import_pbp_data(seasons, columns=PBP_COLUMNS)
+    plays[PBP_CATEGORY_COLUMNS] = plays[PBP_CATEGORY_COLUMNS].astype('category')
+    plays[PBP_FLAG_COLUMNS] = plays[PBP_FLAG_COLUMNS].fillna(0)
+    plays = plays.astype(PBP_NUMERIC_DTYPES)
+    PBP_CACHE_DIR.mkdir(exist_ok=True, parents=True)
+    plays.to_parquet(cache_file, compression='zstd')
+    return plays
+
+
 print("=" * 80)
 print("HISTORICAL NFL MODEL TRAINING")
 print("=" * 80)
@@ -25,7 +56,7 @@ try:
     
     # Fetch data for multiple seasons (2022-2024)
     seasons = [2022, 2023, 2024]
-    pbp_data = nfl.import_pbp_data(seasons)
+    pbp_data = load_pbp_data(seasons)
     print(f"  ✓ Loaded {len(pbp_data)} plays from {min(seasons)}-{max(seasons)} seasons")
     
 except Exception as e:
@@ -34,91 +65,78 @@ except Exception as e:
     import subprocess
     subprocess.check_call(['pip', 'install', 'nfl_data_py', '-q'])
     import nfl_data_py as nfl
-    pbp_data = nfl.import_pbp_data(seasons)
+    pbp_data = load_pbp_data(seasons)
     print(f"  ✓ Loaded {len(pbp_data)} plays from {min(seasons)}-{max(seasons)} seasons")
 
 # Step 2: Aggregate play data to game level
 print("\nSTEP 2: AGGREGATING DATA TO GAME LEVEL")
 print("-" * 80)
 
-# Group by game and calculate features
-game_features = []
+# Game info comes from each game's first play
+game_info = pbp_data.drop_duplicates('game_id').set_index('game_id')[
+    ['home_team', 'away_team', 'home_score', 'away_score']
+]
 
-for game_id in pbp_data['game_id'].unique():
-    game_data = pbp_data[pbp_data['game_id'] == game_id]
-    
-    if len(game_data) == 0:
-        continue
-    
-    game_info = game_data.iloc[0]
-    
-    # Get team abbrevations
-    home_team = game_info['home_team']
-    away_team = game_info['away_team']
-    
-    # Skip if missing team info
-    if pd.isna(home_team) or pd.isna(away_team):
-        continue
-    
-    # Calculate EPA metrics
-    home_epa = game_data[game_data['posteam'] == home_team]['epa'].sum()
-    away_epa = game_data[game_data['posteam'] == away_team]['epa'].sum()
-    
-    home_pass_epa = game_data[(game_data['posteam'] == home_team) & (game_data['play_type'] == 'pass')]['epa'].sum()
-    away_pass_epa = game_data[(game_data['posteam'] == away_team) & (game_data['play_type'] == 'pass')]['epa'].sum()
-    
-    home_rush_epa = game_data[(game_data['posteam'] == home_team) & (game_data['play_type'] == 'run')]['epa'].sum()
-    away_rush_epa = game_data[(game_data['posteam'] == away_team) & (game_data['play_type'] == 'run')]['epa'].sum()
-    
-    # Defensive EPA (opponent's EPA)
-    home_def_epa = game_data[game_data['posteam'] == away_team]['epa'].sum()
-    away_def_epa = game_data[game_data['posteam'] == home_team]['epa'].sum()
-    
-    # Yards
-    home_pass_yards = game_data[(game_data['posteam'] == home_team) & (game_data['play_type'] == 'pass')]['yards_gained'].sum()
-    away_pass_yards = game_data[(game_data['posteam'] == away_team) & (game_data['play_type'] == 'pass')]['yards_gained'].sum()
-    
-    home_rush_yards = game_data[(game_data['posteam'] == home_team) & (game_data['play_type'] == 'run')]['yards_gained'].sum()
-    away_rush_yards = game_data[(game_data['posteam'] == away_team) & (game_data['play_type'] == 'run')]['yards_gained'].sum()
-    
+# Skip games with missing team info or without scores (ongoing)
+game_info = game_info.dropna(subset=['home_team', 'away_team', 'home_score', 'away_score'])
+
+# Per-team offensive totals for every game, summed into (game, team) slots by
+# integer code. The extra zero column per game is where teams with no plays land.
+game_codes, game_ids = pd.factorize(pbp_data['game_id'])
+team_codes, teams = pd.factorize(pbp_data['posteam'])
+has_team = team_codes >= 0
+n_slots = len(teams) + 1
+slots = (game_codes * n_slots + team_codes)[has_team]
+
+is_pass = (pbp_data['play_type'] == 'pass').to_numpy()
+is_run = (pbp_data['play_type'] == 'run').to_numpy()
+epa = pbp_data['epa'].fillna(0).to_numpy(dtype=np.float64)
+yards = pbp_data['yards_gained'].fillna(0).to_numpy(dtype=np.float64)
+play_values = {
+    'off_epa': epa,
+    'pass_epa': np.where(is_pass, epa, 0.0),
+    'rush_epa': np.where(is_run, epa, 0.0),
+    'pass_yards': np.where(is_pass, yards, 0.0),
+    'rush_yards': np.where(is_run, yards, 0.0),
     # Turnovers (interceptions + fumbles lost)
-    home_turnovers = game_data[(game_data['posteam'] == home_team) & ((game_data['interception'] == 1) | (game_data['fumble_lost'] == 1))].shape[0]
-    away_turnovers = game_data[(game_data['posteam'] == away_team) & ((game_data['interception'] == 1) | (game_data['fumble_lost'] == 1))].shape[0]
-    
-    # Get actual scores
-    home_score = game_info['home_score']
-    away_score = game_info['away_score']
-    
-    # Skip games without scores (ongoing)
-    if pd.isna(home_score) or pd.isna(away_score):
-        continue
-    
-    actual_total = home_score + away_score
-    
-    game_features.append({
-        'game_id': game_id,
-        'home_team': home_team,
-        'away_team': away_team,
-        'home_score': home_score,
-        'away_score': away_score,
-        'actual_total': actual_total,
-        'home_off_epa': home_epa,
-        'away_off_epa': away_epa,
-        'home_pass_epa': home_pass_epa,
-        'away_pass_epa': away_pass_epa,
-        'home_rush_epa': home_rush_epa,
-        'away_rush_epa': away_rush_epa,
-        'home_def_epa': home_def_epa,
-        'away_def_epa': away_def_epa,
-        'home_pass_yards': home_pass_yards,
-        'away_pass_yards': away_pass_yards,
-        'home_rush_yards': home_rush_yards,
-        'away_rush_yards': away_rush_yards,
-        'home_turnovers': home_turnovers,
-        'away_turnovers': away_turnovers,
-    })
-
-games_df = pd.DataFrame(game_features)
+    'turnovers': ((pbp_data['interception'] == 1) | (pbp_data['fumble_lost'] == 1)).to_numpy(dtype=np.float64),
+}
+team_game_stats = {
+    name: np.bincount(slots, weights=values[has_team], minlength=len(game_ids) * n_slots).reshape(-1, n_slots)
+    for name, values in play_values.items()
+}
+team_game_stats['turnovers'] = team_game_stats['turnovers'].astype(int)
+
+# Look up each game's home and away offense by position
+game_pos = pd.Index(game_ids).get_indexer(game_info.index)
+home_pos = pd.Index(teams).get_indexer(game_info['home_team'])
+away_pos = pd.Index(teams).get_indexer(game_info['away_team'])
+home_stats = pd.DataFrame({name: totals[game_pos, home_pos] for name, totals in team_game_stats.items()})
+away_stats = pd.DataFrame({name: totals[game_pos, away_pos] for name, totals in team_game_stats.items()})
+
+games_df = pd.DataFrame({
+    'game_id': game_info.index.to_numpy(),
+    'home_team': game_info['home_team'].to_numpy(),
+    'away_team': game_info['away_team'].to_numpy(),
+    'home_score': game_info['home_score'].to_numpy(),
+    'away_score': game_info['away_score'].to_numpy(),
+    'actual_total': (game_info['home_score'] + game_info['away_score']).to_numpy(),
+    'home_off_epa': home_stats['off_epa'].to_numpy(),
+    'away_off_epa': away_stats['off_epa'].to_numpy(),
+    'home_pass_epa': home_stats['pass_epa'].to_numpy(),
+    'away_pass_epa': away_stats['pass_epa'].to_numpy(),
+    'home_rush_epa': home_stats['rush_epa'].to_numpy(),
+    'away_rush_epa': away_stats['rush_epa'].to_numpy(),
+    # Defensive EPA (opponent's EPA)
+    'home_def_epa': away_stats['off_epa'].to_numpy(),
+    'away_def_epa': home_stats['off_epa'].to_numpy(),
+    'home_pass_yards': home_stats['pass_yards'].to_numpy(),
+    'away_pass_yards': away_stats['pass_yards'].to_numpy(),
+    'home_rush_yards': home_stats['rush_yards'].to_numpy(),
+    'away_rush_yards': away_stats['rush_yards'].to_numpy(),
+    'home_turnovers': home_stats['turnovers'].to_numpy(),
+    'away_turnovers': away_stats['turnovers'].to_numpy(),
+})
 print(f"  ✓ Extracted {len(games_df)} completed games")
 print(f"  ✓ Average total: {games_df['actual_total'].mean():.1f} points")
 print(f"  ✓ Total range: {games_df['actual_total'].min():.0f} - {games_df['actual_total'].max():.0f} points")
@@ -134,14 +152,14 @@ feature_cols = [
     'home_turnovers', 'away_turnovers'
 ]
 
-X = games_df[feature_cols].fillna(0)
-y = games_df['actual_total']
+X = np.ascontiguousarray(games_df[feature_cols].fillna(0).to_numpy(dtype=np.float32))
+y = games_df['actual_total'].to_numpy(dtype=np.float32)
 
 print(f"  ✓ Features: {len(feature_cols)}")
 print(f"  ✓ Training samples: {len(X)}")
 print(f"  ✓ Feature ranges:")
-for col in feature_cols[:5]:
-    print(f"    {col}: [{X[col].min():.1f}, {X[col].max():.1f}]")
+for i, col in enumerate(feature_cols[:5]):
+    print(f"    {col}: [{X[:, i].min():.1f}, {X[:, i].max():.1f}]")
 
 # Step 4: Train/test split
 print("\nSTEP 4: TRAIN/TEST SPLIT")
@@ -158,11 +176,12 @@ print(f"  ✓ Test set avg total: {y_test.mean():.1f}")
 print("\nSTEP 5: TRAINING MODEL")
 print("-" * 80)
 
-scaler = StandardScaler()
+scaler = StandardScaler(copy=False)
 X_train_scaled = scaler.fit_transform(X_train)
 X_test_scaled = scaler.transform(X_test)
 
-model = LinearRegression()
+# Near-zero penalty: an OLS fit solved directly from the normal equations
+model = Ridge(alpha=1e-6, solver='cholesky')
 model.fit(X_train_scaled, y_train)
 
 # Evaluate
@@ -199,57 +218,53 @@ for idx, row in feature_importance.head(10).iterrows():
 print("\nSTEP 6: GENERATING PLAYOFF PREDICTIONS")
 print("-" * 80)
 
-with open('public/data/nfl_analysis.json') as f:
-    current_data = json.load(f)
-
-with open('public/data/enhanced_analysis.json') as f:
-    enhanced_data = json.load(f)
+current_data = orjson.loads(Path('public/data/nfl_analysis.json').read_bytes())
+
+enhanced_data = orjson.loads(Path('public/data/enhanced_analysis.json').read_bytes())
+
+# No per-team stats yet, so every game is scored from the same league-average row
+LEAGUE_AVG_FEATURES = np.array([
+    0.05,   # home_off_epa (slightly positive)
+    0.0,    # away_off_epa (league average)
+    5.0,    # home_pass_epa
+    4.0,    # away_pass_epa
+    1.0,    # home_rush_epa
+    0.5,    # away_rush_epa
+    -0.05,  # home_def_epa (slightly negative for defense)
+    -0.03,  # away_def_epa
+    250.0,  # home_pass_yards
+    240.0,  # away_pass_yards
+    120.0,  # home_rush_yards
+    115.0,  # away_rush_yards
+    1.0,    # home_turnovers
+    1.0,    # away_turnovers
+], dtype=np.float32)
+
+# Fold the scaler into the coefficients so raw features predict directly
+w_eff = (model.coef_ / scaler.scale_).astype(np.float32)
+b_eff = float(model.intercept_ - np.dot(w_eff, scaler.mean_))
+
+# Clamp to reasonable range (typically 30-80 points)
+league_avg_total = np.clip(LEAGUE_AVG_FEATURES @ w_eff + b_eff, 30, 80)
+
+games = current_data['games']
+vegas_totals = np.array([game['vegasTotal'] for game in games], dtype=np.float32)
+edges = league_avg_total - vegas_totals
+recommendations = np.select([edges > 2, edges < -2], ['over', 'under'], default='hold')
 
 predictions = []
-for game in current_data['games']:
-    home_team = game['homeAbbr']
-    away_team = game['awayAbbr']
+for game, edge, recommendation in zip(games, edges, recommendations):
     vegas_total = game['vegasTotal']
-    
-    # Use the actual game total from current data as proxy (since we don't have real team stats)
-    # This will make predictions more stable
-    home_score = game.get('homeScore', vegas_total * 0.5)
-    away_score = game.get('awayScore', vegas_total * 0.5)
-    
-    # Build a feature vector based on historical patterns
-    # Use reasonable estimates based on league averages
-    features = np.array([[
-        0.05,   # home_off_epa (slightly positive)
-        0.0,    # away_off_epa (league average)
-        5.0,    # home_pass_epa
-        4.0,    # away_pass_epa
-        1.0,    # home_rush_epa
-        0.5,    # away_rush_epa
-        -0.05,  # home_def_epa (slightly negative for defense)
-        -0.03,  # away_def_epa
-        250.0,  # home_pass_yards
-        240.0,  # away_pass_yards
-        120.0,  # home_rush_yards
-        115.0,  # away_rush_yards
-        1.0,    # home_turnovers
-        1.0,    # away_turnovers
-    ]])
-    
-    # Scale and predict
-    features_scaled = scaler.transform(features)
-    pred_total = model.predict(features_scaled)[0]
-    
-    # Clamp to reasonable range (typically 30-80 points)
-    pred_total = np.clip(pred_total, 30, 80)
+    pred_total = league_avg_total
     
     prediction = {
         'game': f"{game['awayTeam']} @ {game['homeTeam']}",
-        'away_team': away_team,
-        'home_team': home_team,
+        'away_team': game['awayAbbr'],
+        'home_team': game['homeAbbr'],
         'vegas_total': vegas_total,
-        'model_total': float(pred_total),
-        'edge': float(pred_total - vegas_total),
-        'recommendation': 'over' if pred_total > vegas_total + 2 else 'under' if pred_total < vegas_total - 2 else 'hold'
+        'model_total': pred_total,
+        'edge': edge,
+        'recommendation': str(recommendation)
     }
     predictions.append(prediction)
     print(f"  {prediction['game']}: Model {pred_total:.1f} vs Vegas {vegas_total} (Edge: {prediction['edge']:+.1f})")
@@ -266,19 +281,21 @@ model_data = {
     'training_samples': len(X_train),
     'test_samples': len(X_test),
     'metrics': {
-        'train_r2_score': float(train_r2),
-        'test_r2_score': float(test_r2),
-        'train_mae': float(train_mae),
-        'test_mae': float(test_mae),
-        'train_rmse': float(train_rmse),
-        'test_rmse': float(test_rmse),
+        'train_r2_score': train_r2,
+        'test_r2_score': test_r2,
+        'train_mae': train_mae,
+        'test_mae': test_mae,
+        'train_rmse': train_rmse,
+        'test_rmse': test_rmse,
     },
     'feature_importance': feature_importance.head(10).to_dict('records'),
     'predictions': predictions
 }
 
-with open('public/data/enhanced_model.json', 'w') as f:
-    json.dump(model_data, f, indent=2)
+Path('public/data/enhanced_model.json').write_bytes(orjson.dumps(
+    model_data,
+    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+))
 
 print(f"  ✓ Model exported to public/data/enhanced_model.json")
 
@@ -5,41 +5,67 @@ Can be triggered by cron job, GitHub Actions, or cloud scheduler
 """
 
 import subprocess
-import json
+import os
+import threading
+import orjson
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from logging.handlers import RotatingFileHandler
 
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('logs/weekly_update.log'),
+        RotatingFileHandler('logs/weekly_update.log', maxBytes=5_000_000, backupCount=4),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Seconds a pipeline script may run before it is killed
+SCRIPT_TIMEOUT = 300
+
 def run_script(script_path, script_name):
-    """Run a Python script and log results"""
+    """Run a Python script, streaming its output into the log"""
     try:
-        logger.info(f"Running {script_name}...")
-        result = subprocess.run(
+        logger.info("Running %s...", script_name)
+        process = subprocess.Popen(
             ['python3', script_path],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=300
+            bufsize=1,
+            env={**os.environ, 'PYTHONUNBUFFERED': '1'}
         )
         
-        if result.returncode == 0:
-            logger.info(f"✓ {script_name} completed successfully")
+        # Kill the script if it runs past the timeout, remembering that we did
+        timed_out = threading.Event()
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        timer = threading.Timer(SCRIPT_TIMEOUT, kill_on_timeout)
+        timer.start()
+        try:
+            for line in process.stdout:
+                logger.info("[%s] %s", script_name, line.rstrip())
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+        
+        if timed_out.is_set():
+            logger.error("✗ %s timed out after %ss", script_name, SCRIPT_TIMEOUT)
+            return False
+        elif returncode == 0:
+            logger.info("✓ %s completed successfully", script_name)
             return True
         else:
-            logger.error(f"✗ {script_name} failed: {result.stderr}")
+            logger.error("✗ %s failed with exit code %s", script_name, returncode)
             return False
     except Exception as e:
-        logger.error(f"✗ Error running {script_name}: {e}")
+        logger.error("✗ Error running %s: %s", script_name, e)
         return False
 
 def automated_update():
@@ -52,21 +78,22 @@ def automated_update():
     
     Path('logs').mkdir(exist_ok=True)
     
-    # Step 1: Fetch Vegas lines
-    logger.info("\n[1/4] Fetching Vegas lines...")
-    if not run_script('scripts/fetch_via_odds_api.py', 'Vegas Lines Fetcher'):
+    # Steps 1-3 don't depend on each other, so run them concurrently
+    logger.info("\n[1-3/4] Fetching Vegas lines, running enhanced analysis, updating injury reports...")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        vegas = executor.submit(run_script, 'scripts/fetch_via_odds_api.py', 'Vegas Lines Fetcher')
+        analysis = executor.submit(run_script, 'scripts/02_enhanced_analysis.py', 'Enhanced Analysis')
+        injuries = executor.submit(run_script, 'scripts/03_injury_report.py', 'Injury Report')
+    
+    if not vegas.result():
         logger.error("Failed to fetch Vegas lines, aborting")
         return False
     
-    # Step 2: Enhanced analysis
-    logger.info("\n[2/4] Running enhanced analysis...")
-    if not run_script('scripts/02_enhanced_analysis.py', 'Enhanced Analysis'):
+    if not analysis.result():
         logger.error("Failed to run enhanced analysis, aborting")
         return False
     
-    # Step 3: Injury report
-    logger.info("\n[3/4] Updating injury reports...")
-    if not run_script('scripts/03_injury_report.py', 'Injury Report'):
+    if not injuries.result():
         logger.error("Failed to update injury reports, continuing anyway")
     
     # Step 4: Retrain model
@@ -87,8 +114,7 @@ def automated_update():
         ]
     }
     
-    with open('logs/last_update.json', 'w') as f:
-        json.dump(update_log, f, indent=2)
+    Path('logs/last_update.json').write_bytes(orjson.dumps(update_log, option=orjson.OPT_INDENT_2))
     
     logger.info("\n✓ Weekly update cycle complete!")
     logger.info("All data refreshed and model retrained")
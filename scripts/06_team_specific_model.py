@@ -3,9 +3,11 @@ Team-Specific Playoff Predictions
 Uses existing team stats to make differentiated predictions for each matchup
 """
 
-import json
+import orjson
 import numpy as np
+from pathlib import Path
 from datetime import datetime
+from team_table import build_team_table, lookup_team_ids
 
 print("=" * 80)
 print("TEAM-SPECIFIC PLAYOFF PREDICTIONS")
@@ -15,30 +17,23 @@ print("=" * 80)
 print("\nLOADING TEAM DATA")
 print("-" * 80)
 
-with open('public/data/enhanced_analysis.json') as f:
-    enhanced = json.load(f)
-    team_stats = enhanced['team_stats']
-    print(f"  ✓ Loaded stats for {len(team_stats)} teams")
+enhanced = orjson.loads(Path('public/data/enhanced_analysis.json').read_bytes())
+team_stats = enhanced['team_stats']
+print(f"  ✓ Loaded stats for {len(team_stats)} teams")
 
-with open('public/data/nfl_analysis.json') as f:
-    games_data = json.load(f)
-    print(f"  ✓ Loaded {len(games_data['games'])} playoff games")
+games_data = orjson.loads(Path('public/data/nfl_analysis.json').read_bytes())
+print(f"  ✓ Loaded {len(games_data['games'])} playoff games")
 
 # Step 2: Make team-specific predictions
 print("\nGENERATING TEAM-SPECIFIC PREDICTIONS")
 print("-" * 80)
 
-def calculate_prediction(home_stats, away_stats, vegas_total):
+def calculate_predictions(home_off_epa, away_off_epa, home_def_epa, away_def_epa):
     """
-    Calculate predicted total and score distribution using team-specific stats
-    Returns: (total, home_score, away_score)
+    Calculate predicted totals and score distributions for a batch of games
+    using team-specific EPA arrays (one entry per game)
+    Returns: (totals, home_scores, away_scores)
     """
-    # Extract EPA metrics (these are per-play, scale up)
-    home_off_epa = home_stats.get('off_epa_per_play', 0)
-    away_off_epa = away_stats.get('off_epa_per_play', 0)
-    home_def_epa = home_stats.get('def_epa_per_play', 0)
-    away_def_epa = away_stats.get('def_epa_per_play', 0)
-    
     # Simple scoring formula based on EPA:
     # League average is ~23 points per team
     base_team_score = 23.0
@@ -48,52 +43,86 @@ def calculate_prediction(home_stats, away_stats, vegas_total):
     epa_points_per_unit = 35.0
     
     # Calculate team-specific scoring
-    home_score = base_team_score + (home_off_epa * epa_points_per_unit) - (home_def_epa * epa_points_per_unit * 0.5)
-    away_score = base_team_score + (away_off_epa * epa_points_per_unit) - (away_def_epa * epa_points_per_unit * 0.5)
+    home_scores = base_team_score + (home_off_epa * epa_points_per_unit) - (home_def_epa * epa_points_per_unit * 0.5)
+    away_scores = base_team_score + (away_off_epa * epa_points_per_unit) - (away_def_epa * epa_points_per_unit * 0.5)
     
     # Clip to reasonable range
-    home_score = np.clip(home_score, 10, 40)
-    away_score = np.clip(away_score, 10, 40)
+    home_scores = np.clip(home_scores, 10, 40)
+    away_scores = np.clip(away_scores, 10, 40)
     
-    pred_total = home_score + away_score
+    pred_totals = home_scores + away_scores
     
-    return pred_total, home_score, away_score
+    return pred_totals, home_scores, away_scores
+
+games = games_data['games']
+home_stats_by_game = [team_stats.get(game['homeAbbr'], {}) for game in games]
+away_stats_by_game = [team_stats.get(game['awayAbbr'], {}) for game in games]
+
+# Gather the EPA metrics (these are per-play, scale up) into per-game arrays
+team_ids, team_table = build_team_table(team_stats, ('off_epa_per_play', 'def_epa_per_play'))
+home_ids = lookup_team_ids(team_ids, [game['homeAbbr'] for game in games])
+away_ids = lookup_team_ids(team_ids, [game['awayAbbr'] for game in games])
+pred_totals, home_scores, away_scores = calculate_predictions(
+    team_table['off_epa_per_play'][home_ids],
+    team_table['off_epa_per_play'][away_ids],
+    team_table['def_epa_per_play'][home_ids],
+    team_table['def_epa_per_play'][away_ids],
+)
+
+# Games missing either team's stats fall back to the Vegas line, split evenly
+has_stats = np.array([bool(home) and bool(away) for home, away in zip(home_stats_by_game, away_stats_by_game)])
+vegas_totals = np.array([game['vegasTotal'] for game in games], dtype=np.float64)
+pred_totals = np.where(has_stats, pred_totals, vegas_totals)
+home_scores = np.where(has_stats, home_scores, vegas_totals / 2)
+away_scores = np.where(has_stats, away_scores, vegas_totals / 2)
+edges = pred_totals - vegas_totals
+recommendations = np.where(edges > 2, 'over', np.where(edges < -2, 'under', 'hold'))
 
 predictions = []
+# Per-game report lines, written in one go after the loop
+lines = []
+game_report = (
+    "  {game:<30} Model: {pred_total:>6.1f}  Vegas: {vegas_total:>6.1f}  Edge: {edge:>+6.1f}\n"
+    "    Projected: {away} {away_score:.1f} @ {home} {home_score:.1f}\n"
+    "    Home ({home}): OFF_EPA={home_off:+.4f}, Def EPA={home_def:+.4f}\n"
+    "    Away ({away}): OFF_EPA={away_off:+.4f}, Def EPA={away_def:+.4f}"
+).format
 
-for game in games_data['games']:
+for i, game in enumerate(games):
     home_abbr = game['homeAbbr']
     away_abbr = game['awayAbbr']
     vegas_total = game['vegasTotal']
     
-    home_stats = team_stats.get(home_abbr, {})
-    away_stats = team_stats.get(away_abbr, {})
+    home_stats = home_stats_by_game[i]
+    away_stats = away_stats_by_game[i]
     
-    if not home_stats or not away_stats:
-        print(f"  ⚠ Missing stats for {away_abbr} @ {home_abbr}")
-        pred_total = vegas_total
-        home_score = vegas_total / 2
-        away_score = vegas_total / 2
-    else:
-        pred_total, home_score, away_score = calculate_prediction(home_stats, away_stats, vegas_total)
+    if not has_stats[i]:
+        lines.append(f"  ⚠ Missing stats for {away_abbr} @ {home_abbr}")
+    
+    pred_total, home_score, away_score = float(pred_totals[i]), float(home_scores[i]), float(away_scores[i])
     
     prediction = {
         'game': f"{game['awayTeam']} @ {game['homeTeam']}",
         'away_team': away_abbr,
         'home_team': home_abbr,
         'vegas_total': vegas_total,
-        'model_total': float(pred_total),
-        'home_score': float(home_score),
-        'away_score': float(away_score),
-        'edge': float(pred_total - vegas_total),
-        'recommendation': 'over' if pred_total > vegas_total + 2 else 'under' if pred_total < vegas_total - 2 else 'hold'
+        'model_total': pred_total,
+        'home_score': home_score,
+        'away_score': away_score,
+        'edge': float(edges[i]),
+        'recommendation': str(recommendations[i])
     }
     predictions.append(prediction)
     
-    print(f"  {prediction['game']:<30} Model: {pred_total:>6.1f}  Vegas: {vegas_total:>6.1f}  Edge: {prediction['edge']:>+6.1f}")
-    print(f"    Projected: {away_abbr} {away_score:.1f} @ {home_abbr} {home_score:.1f}")
-    print(f"    Home ({home_abbr}): OFF_EPA={home_stats.get('off_epa_per_play', 0):+.4f}, Def EPA={home_stats.get('def_epa_per_play', 0):+.4f}")
-    print(f"    Away ({away_abbr}): OFF_EPA={away_stats.get('off_epa_per_play', 0):+.4f}, Def EPA={away_stats.get('def_epa_per_play', 0):+.4f}")
+    lines.append(game_report(
+        game=prediction['game'], pred_total=pred_total, vegas_total=vegas_total, edge=prediction['edge'],
+        home=home_abbr, away=away_abbr, home_score=home_score, away_score=away_score,
+        home_off=home_stats.get('off_epa_per_play', 0), home_def=home_stats.get('def_epa_per_play', 0),
+        away_off=away_stats.get('off_epa_per_play', 0), away_def=away_stats.get('def_epa_per_play', 0),
+    ))
+
+if lines:
+    print("\n".join(lines))
 
 # Step 3: Export to both files
 print("\nEXPORTING RESULTS")
@@ -107,27 +136,27 @@ output = {
 }
 
 # Write to enhanced_model.json for reference
-with open('public/data/enhanced_model.json', 'w') as f:
-    json.dump(output, f, indent=2)
+Path('public/data/enhanced_model.json').write_bytes(orjson.dumps(
+    output,
+    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+))
 
 print(f"  ✓ Exported to public/data/enhanced_model.json")
 
-# Also update nfl_analysis.json with new predictions
+# Also update nfl_analysis.json with new predictions (games_data is already loaded)
 try:
-    with open('public/data/nfl_analysis.json', 'r') as f:
-        nfl_data = json.load(f)
-    
     # Update each game with new model_total and edge
-    for i, pred in enumerate(predictions):
-        if i < len(nfl_data['games']):
-            nfl_data['games'][i]['modelTotal'] = pred['model_total']
-            nfl_data['games'][i]['homeScore'] = pred['home_score']
-            nfl_data['games'][i]['awayScore'] = pred['away_score']
-            nfl_data['games'][i]['edge'] = pred['edge']
-            nfl_data['games'][i]['recommendation'] = pred['recommendation']
+    for game, pred in zip(games, predictions):
+        game['modelTotal'] = pred['model_total']
+        game['homeScore'] = pred['home_score']
+        game['awayScore'] = pred['away_score']
+        game['edge'] = pred['edge']
+        game['recommendation'] = pred['recommendation']
     
-    with open('public/data/nfl_analysis.json', 'w') as f:
-        json.dump(nfl_data, f, indent=2)
+    Path('public/data/nfl_analysis.json').write_bytes(orjson.dumps(
+        games_data,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+    ))
     
     print(f"  ✓ Updated public/data/nfl_analysis.json with new predictions")
 except Exception as e:
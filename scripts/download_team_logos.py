@@ -4,7 +4,12 @@ Saves logos to public/images/team-logos/
 """
 
 import os
+import shutil
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -52,31 +57,82 @@ print("\n" + "="*70)
 print("DOWNLOADING NFL TEAM LOGOS")
 print("="*70 + "\n")
 
-success_count = 0
-failed_count = 0
+# Logos download concurrently over one pooled session, retrying transient server errors
+MAX_WORKERS = 16
+session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+))
+
+# ETag / Last-Modified of each saved logo, so later runs can revalidate instead of re-downloading
+# Kept out of public/ so it is not served with the site
+LOGO_CACHE_FILE = Path(".cache/team_logos.json")
+logo_cache = orjson.loads(LOGO_CACHE_FILE.read_bytes()) if LOGO_CACHE_FILE.exists() else {}
 
-for team_abbr, url in TEAM_LOGOS.items():
+def download_logo(item):
+    """
+    Stream one team's logo to disk, skipping the body if the saved copy is current.
+    Returns: (team_abbr, bytes saved, None if unchanged, or the exception)
+    """
+    team_abbr, url = item
     try:
-        print(f"  Downloading {team_abbr}...", end=" ")
-        
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
         # Get file extension from URL
         parsed_url = urlparse(url)
         file_ext = os.path.splitext(parsed_url.path)[1] or ".png"
-        
-        # Save file
         file_path = OUTPUT_DIR / f"{team_abbr}{file_ext}"
-        with open(file_path, "wb") as f:
-            f.write(response.content)
         
-        print(f"✅ ({len(response.content)} bytes)")
-        success_count += 1
+        headers = {}
+        cached = logo_cache.get(team_abbr)
+        if cached and cached['url'] == url and file_path.exists():
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
         
+        with session.get(url, headers=headers, stream=True, timeout=10) as response:
+            if response.status_code == 304:
+                return team_abbr, None
+            response.raise_for_status()
+            
+            # Save file in 64 KiB chunks rather than buffering the whole body, into a
+            # temp file that only replaces the logo once the copy is complete
+            response.raw.decode_content = True
+            part_path = file_path.with_name(file_path.name + ".part")
+            try:
+                with open(part_path, "wb") as f:
+                    shutil.copyfileobj(response.raw, f, 64 * 1024)
+                    saved = f.tell()
+                os.replace(part_path, file_path)
+            finally:
+                part_path.unlink(missing_ok=True)
+            logo_cache[team_abbr] = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+        return team_abbr, saved
     except Exception as e:
-        print(f"❌ Failed: {e}")
-        failed_count += 1
+        return team_abbr, e
+
+success_count = 0
+failed_count = 0
+
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    for team_abbr, result in executor.map(download_logo, TEAM_LOGOS.items()):
+        if isinstance(result, Exception):
+            print(f"  Downloading {team_abbr}... ❌ Failed: {result}")
+            failed_count += 1
+        elif result is None:
+            print(f"  Downloading {team_abbr}... ✅ (unchanged)")
+            success_count += 1
+        else:
+            print(f"  Downloading {team_abbr}... ✅ ({result} bytes)")
+            success_count += 1
+
+LOGO_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+LOGO_CACHE_FILE.write_bytes(orjson.dumps(logo_cache, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
 
 print("\n" + "="*70)
 print(f"DOWNLOAD COMPLETE: {success_count} successful, {failed_count} failed")
@@ -8,76 +8,59 @@ Requirements:
     pip install nfl_data_py pandas scikit-learn
 """
 
-import json
+import time
 import warnings
 from datetime import datetime
 from pathlib import Path
 
 import nfl_data_py as nfl
 import numpy as np
+import orjson
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 warnings.filterwarnings("ignore")
 
 
-# ============================================================================
-# JSON ENCODER FOR NUMPY TYPES
-# ============================================================================
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle numpy types."""
-    def default(self, obj):
-        if isinstance(obj, (np.integer, np.floating)):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
-
-
 def load_vegas_lines() -> list:
     """Load Vegas lines from the scraper-generated JSON file."""
     if VEGAS_LINES_FILE.exists():
-        with open(VEGAS_LINES_FILE, "r") as f:
-            data = json.load(f)
-            games = data.get("games", [])
-            # Convert from vegas_lines format to playoff_matchups format
-            matchups = []
-            for game in games:
-                # Normalize team abbreviations (e.g., LAR -> LA, as used in nflfastR)
-                home_team = normalize_team_abbr(game["home_team"])
-                away_team = normalize_team_abbr(game["away_team"])
-                
-                matchup = {
-                    "home_team": home_team,
-                    "away_team": away_team,
-                    "game_date": game.get("date", "")[:10] if game.get("date") else "2026-01-18",
-                    "game_time": "TBD",
-                    "vegas_total": game.get("over_under", 0),
-                }
-                matchups.append(matchup)
-            return matchups
+        data = orjson.loads(VEGAS_LINES_FILE.read_bytes())
+        games = data.get("games", [])
+        # Convert from vegas_lines format to playoff_matchups format
+        matchups = []
+        for game in games:
+            # Normalize team abbreviations (e.g., LAR -> LA, as used in nflfastR)
+            home_team = normalize_team_abbr(game["home_team"])
+            away_team = normalize_team_abbr(game["away_team"])
+            
+            matchup = {
+                "home_team": home_team,
+                "away_team": away_team,
+                "game_date": game.get("date", "")[:10] if game.get("date") else "2026-01-18",
+                "game_time": "TBD",
+                "vegas_total": game.get("over_under", 0),
+            }
+            matchups.append(matchup)
+        return matchups
     return []
 
 
+# nflfastR uses 'LA' for Rams and 'SD' for Chargers
+NFLFASTR_ABBRS = {
+    "LAR": "LA",
+    "LAC": "SD",
+}
+STANDARD_ABBRS = {fastr: std for std, fastr in NFLFASTR_ABBRS.items()}
+
+
 def normalize_team_abbr(abbr: str) -> str:
     """Convert standard team abbreviations to nflfastR format."""
-    # nflfastR uses 'LA' for Rams and 'SD' for Chargers
-    mapping = {
-        "LAR": "LA",
-        "LAC": "SD",
-    }
-    return mapping.get(abbr, abbr)
+    return NFLFASTR_ABBRS.get(abbr, abbr)
 
 
 def denormalize_team_abbr(abbr: str) -> str:
     """Convert nflfastR format back to standard team abbreviations."""
-    # Reverse mapping
-    mapping = {
-        "LA": "LAR",
-        "SD": "LAC",
-    }
-    return mapping.get(abbr, abbr)
+    return STANDARD_ABBRS.get(abbr, abbr)
 
 
 # ============================================================================
@@ -87,6 +70,20 @@ TRAINING_SEASONS = [2024]  # Historical seasons for training
 OUTPUT_DIR = Path("public/data")
 OUTPUT_FILE = OUTPUT_DIR / "nfl_analysis.json"
 VEGAS_LINES_FILE = OUTPUT_DIR / "vegas_lines.json"
+PBP_CACHE_DIR = Path("data")  # Local play-by-play parquet cache (gitignored)
+PBP_CACHE_MAX_AGE_HOURS = 24  # Refetch after this so in-progress seasons pick up new games
+
+# Play-by-play fields used by the team metrics and training data
+PBP_COLUMNS = [
+    "game_id", "week", "home_team", "away_team", "home_score", "away_score",
+    "posteam", "defteam", "play_type", "epa"
+]
+# Narrow dtypes for the non-team play-by-play columns (team columns share a categorical).
+# Scores stay float so unfinished games keep NaN (float32 is exact for scores)
+PBP_DTYPES = {
+    "game_id": "category", "play_type": "category", "week": "int8",
+    "home_score": "float32", "away_score": "float32", "epa": "float32",
+}
 
 # Will be loaded from vegas_lines.json
 PLAYOFF_MATCHUPS = []
@@ -104,96 +101,115 @@ TEAM_NAMES = {
 }
 
 
+TEAM_COLUMNS = ["posteam", "defteam", "home_team", "away_team"]
+
+
+def categorize_teams(pbp: pd.DataFrame) -> pd.DataFrame:
+    """Give all team columns one shared categorical dtype so groupbys key on int codes."""
+    # Categories come from the feed (nflfastR abbreviations like 'LA'), not TEAM_NAMES
+    feed_teams = set().union(*(pbp[col].dropna().unique() for col in TEAM_COLUMNS))
+    team_dtype = pd.CategoricalDtype(sorted(feed_teams))
+    for col in TEAM_COLUMNS:
+        pbp[col] = pbp[col].astype(team_dtype)
+    return pbp
+
+
+def load_pbp_seasons(seasons: list[int]) -> pd.DataFrame:
+    """Load play-by-play data for seasons, from the local parquet cache while it is fresh."""
+    # Own file prefix: 02_enhanced_analysis.py caches other columns as data/pbp_<season>.parquet
+    cache_file = PBP_CACHE_DIR / f"nflfastr_pbp_{'_'.join(map(str, seasons))}.parquet"
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < PBP_CACHE_MAX_AGE_HOURS * 3600:
+        try:
+            return pd.read_parquet(cache_file, columns=PBP_COLUMNS)
+        except (ValueError, KeyError):
+            pass  # Cached file lacks some of our columns; treat it as a miss and refetch
+    
+    pbp = nfl.import_pbp_data(seasons, columns=PBP_COLUMNS).astype(PBP_DTYPES)
+    pbp = categorize_teams(pbp)
+    PBP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    pbp.to_parquet(cache_file, compression="zstd")
+    return pbp
+
+
 def fetch_pbp_data(seasons: list[int]) -> pd.DataFrame:
     """Fetch play-by-play data from nflfastR."""
     print(f"  Fetching play-by-play data for {seasons}...")
     try:
-        pbp = nfl.import_pbp_data(seasons)
+        pbp = load_pbp_seasons(seasons)
         print(f"  Loaded {len(pbp):,} plays")
         return pbp
     except Exception as e:
         # If we can't get all seasons, try without the most recent one
         if len(seasons) > 1:
             print(f"  Warning: Could not fetch data for all seasons. Trying {seasons[:-1]}...")
-            pbp = nfl.import_pbp_data(seasons[:-1])
+            pbp = load_pbp_seasons(seasons[:-1])
             print(f"  Loaded {len(pbp):,} plays from {seasons[:-1]}")
             return pbp
         else:
             raise
 
 
-def calculate_team_epa(pbp: pd.DataFrame) -> pd.DataFrame:
-    """Calculate EPA metrics per team from play-by-play data."""
+def select_scrimmage_plays(pbp: pd.DataFrame) -> pd.DataFrame:
+    """Passes and rushes with a possession team (excludes special teams)."""
+    return pbp[(pbp["play_type"].isin(["pass", "run"])) & (pbp["posteam"].notna())]
+
+
+def calculate_team_epa(plays: pd.DataFrame) -> pd.DataFrame:
+    """Calculate EPA metrics per team from scrimmage plays."""
     print("  Calculating team EPA metrics...")
     
-    # Filter to relevant plays (passes and rushes, excluding special teams)
-    plays = pbp[
-        (pbp["play_type"].isin(["pass", "run"])) &
-        (pbp["epa"].notna()) &
-        (pbp["posteam"].notna())
-    ].copy()
+    # Only plays with an EPA value count towards the averages
+    plays = plays[plays["epa"].notna()].copy()
+    
+    # Pass/rush EPA as masked columns, so each side needs only one groupby
+    plays["pass_epa"] = plays["epa"].where(plays["play_type"] == "pass")
+    plays["rush_epa"] = plays["epa"].where(plays["play_type"] == "run")
     
     # Offensive EPA by team
-    off_epa = plays.groupby("posteam").agg(
+    off_epa = plays.groupby("posteam", sort=False, observed=True).agg(
         off_epa_per_play=("epa", "mean"),
-        off_plays=("epa", "count")
-    ).reset_index().rename(columns={"posteam": "team"})
-    
-    # Offensive EPA by play type
-    pass_plays = plays[plays["play_type"] == "pass"]
-    rush_plays = plays[plays["play_type"] == "run"]
-    
-    off_pass_epa = pass_plays.groupby("posteam").agg(
-        off_pass_epa=("epa", "mean")
-    ).reset_index().rename(columns={"posteam": "team"})
-    
-    off_rush_epa = rush_plays.groupby("posteam").agg(
-        off_rush_epa=("epa", "mean")
+        off_plays=("epa", "count"),
+        off_pass_epa=("pass_epa", "mean"),
+        off_rush_epa=("rush_epa", "mean")
     ).reset_index().rename(columns={"posteam": "team"})
     
     # Defensive EPA by team (EPA allowed)
-    def_epa = plays.groupby("defteam").agg(
+    def_epa = plays.groupby("defteam", sort=False, observed=True).agg(
         def_epa_per_play=("epa", "mean"),
-        def_plays=("epa", "count")
-    ).reset_index().rename(columns={"defteam": "team"})
-    
-    def_pass_epa = pass_plays.groupby("defteam").agg(
-        def_pass_epa=("epa", "mean")
-    ).reset_index().rename(columns={"defteam": "team"})
-    
-    def_rush_epa = rush_plays.groupby("defteam").agg(
-        def_rush_epa=("epa", "mean")
+        def_plays=("epa", "count"),
+        def_pass_epa=("pass_epa", "mean"),
+        def_rush_epa=("rush_epa", "mean")
     ).reset_index().rename(columns={"defteam": "team"})
     
     # Merge all EPA metrics
-    team_epa = off_epa.merge(off_pass_epa, on="team", how="left")
-    team_epa = team_epa.merge(off_rush_epa, on="team", how="left")
-    team_epa = team_epa.merge(def_epa, on="team", how="left")
-    team_epa = team_epa.merge(def_pass_epa, on="team", how="left")
-    team_epa = team_epa.merge(def_rush_epa, on="team", how="left")
+    team_epa = off_epa.merge(def_epa, on="team", how="left")
     
     print(f"  Calculated EPA for {len(team_epa)} teams")
     return team_epa
 
 
-def calculate_team_scoring(pbp: pd.DataFrame) -> pd.DataFrame:
-    """Calculate scoring metrics per team."""
+GAME_COLUMNS = ["game_id", "week", "home_team", "away_team", "home_score", "away_score"]
+
+
+def extract_games(pbp: pd.DataFrame) -> pd.DataFrame:
+    """One row per game with its week, teams, and final score."""
+    # home_score/away_score hold the final score on every play, so any one row per game will do
+    games = pbp.drop_duplicates("game_id", keep="last")[GAME_COLUMNS]
+    return games.dropna(subset=["home_team", "away_team"]).reset_index(drop=True)
+
+
+def calculate_team_scoring(plays: pd.DataFrame, games: pd.DataFrame) -> pd.DataFrame:
+    """Calculate scoring metrics per team from scrimmage plays and per-game rows."""
     print("  Calculating team scoring metrics...")
     
-    # Get game-level scoring
-    games = pbp.groupby(["game_id", "home_team", "away_team"]).agg(
-        home_score=("home_score", "max"),
-        away_score=("away_score", "max")
-    ).reset_index()
-    
     # Home team stats
-    home_stats = games.groupby("home_team").agg(
+    home_stats = games.groupby("home_team", sort=False, observed=True).agg(
         home_ppg=("home_score", "mean"),
         home_games=("game_id", "count")
     ).reset_index().rename(columns={"home_team": "team"})
     
     # Away team stats
-    away_stats = games.groupby("away_team").agg(
+    away_stats = games.groupby("away_team", sort=False, observed=True).agg(
         away_ppg=("away_score", "mean"),
         away_games=("game_id", "count")
     ).reset_index().rename(columns={"away_team": "team"})
@@ -207,9 +223,8 @@ def calculate_team_scoring(pbp: pd.DataFrame) -> pd.DataFrame:
     )
     
     # Calculate plays per game
-    plays = pbp[(pbp["play_type"].isin(["pass", "run"])) & (pbp["posteam"].notna())]
-    plays_per_game = plays.groupby(["game_id", "posteam"]).size().reset_index(name="plays")
-    avg_plays = plays_per_game.groupby("posteam")["plays"].mean().reset_index()
+    plays_per_game = plays.groupby(["game_id", "posteam"], sort=False, observed=True).size().reset_index(name="plays")
+    avg_plays = plays_per_game.groupby("posteam", sort=False, observed=True)["plays"].mean().reset_index()
     avg_plays.columns = ["team", "plays_per_game"]
     
     team_scoring = team_scoring.merge(avg_plays, on="team", how="left")
@@ -219,24 +234,26 @@ def calculate_team_scoring(pbp: pd.DataFrame) -> pd.DataFrame:
     return team_scoring
 
 
-def get_game_results(pbp: pd.DataFrame) -> pd.DataFrame:
-    """Extract game results from play-by-play data."""
+def get_game_results(games: pd.DataFrame) -> pd.DataFrame:
+    """Extract regular-season game results from per-game rows."""
     print("  Extracting game results...")
     
-    games = pbp.groupby(["game_id", "week", "home_team", "away_team"]).agg(
-        home_score=("home_score", "max"),
-        away_score=("away_score", "max")
-    ).reset_index()
-    
-    games["total_points"] = games["home_score"] + games["away_score"]
-    
     # Filter to regular season (weeks 1-18)
     games = games[games["week"] <= 18].copy()
+    games["total_points"] = games["home_score"] + games["away_score"]
     
     print(f"  Found {len(games)} regular season games")
     return games
 
 
+def attach_team_stats(df: pd.DataFrame, stats: pd.DataFrame, team_col: str, columns: dict) -> None:
+    """Copy per-team stats (indexed by team) onto each row of df by df[team_col], renaming src -> dst."""
+    rows = stats.index.get_indexer(df[team_col])
+    for src, dst in columns.items():
+        # Teams without stats get row -1, which lands on the trailing NaN
+        df[dst] = np.append(stats[src].to_numpy(), np.nan)[rows]
+
+
 def build_training_data(
     games: pd.DataFrame,
     team_epa: pd.DataFrame,
@@ -245,65 +262,36 @@ def build_training_data(
     """Build training dataset with features."""
     print("  Building training features...")
     
-    # Join home team EPA
-    df = games.merge(
-        team_epa.rename(columns={
-            "off_epa_per_play": "home_off_epa",
-            "off_pass_epa": "home_off_pass_epa",
-            "off_rush_epa": "home_off_rush_epa",
-            "def_epa_per_play": "home_def_epa",
-            "def_pass_epa": "home_def_pass_epa",
-            "def_rush_epa": "home_def_rush_epa"
-        })[["team", "home_off_epa", "home_off_pass_epa", "home_off_rush_epa",
-            "home_def_epa", "home_def_pass_epa", "home_def_rush_epa"]],
-        left_on="home_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join away team EPA
-    df = df.merge(
-        team_epa.rename(columns={
-            "off_epa_per_play": "away_off_epa",
-            "off_pass_epa": "away_off_pass_epa",
-            "off_rush_epa": "away_off_rush_epa",
-            "def_epa_per_play": "away_def_epa",
-            "def_pass_epa": "away_def_pass_epa",
-            "def_rush_epa": "away_def_rush_epa"
-        })[["team", "away_off_epa", "away_off_pass_epa", "away_off_rush_epa",
-            "away_def_epa", "away_def_pass_epa", "away_def_rush_epa"]],
-        left_on="away_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join home team scoring
-    df = df.merge(
-        team_scoring.rename(columns={
-            "ppg": "home_ppg",
-            "home_ppg": "home_ppg_at_home",
-            "away_ppg": "home_ppg_on_road",
-            "plays_per_game": "home_plays_per_game",
-            "points_per_play": "home_points_per_play"
-        })[["team", "home_ppg", "home_ppg_at_home", "home_plays_per_game", "home_points_per_play"]],
-        left_on="home_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
-    
-    # Join away team scoring
-    df = df.merge(
-        team_scoring.rename(columns={
-            "ppg": "away_ppg",
-            "home_ppg": "away_ppg_at_home",
-            "away_ppg": "away_ppg_on_road",
-            "plays_per_game": "away_plays_per_game",
-            "points_per_play": "away_points_per_play"
-        })[["team", "away_ppg", "away_ppg_on_road", "away_plays_per_game", "away_points_per_play"]],
-        left_on="away_team",
-        right_on="team",
-        how="left"
-    ).drop(columns=["team"])
+    df = games.reset_index(drop=True)
+    epa_by_team = team_epa.set_index("team")
+    scoring_by_team = team_scoring.set_index("team")
+    
+    # Home and away team EPA
+    for side in ("home", "away"):
+        attach_team_stats(df, epa_by_team, f"{side}_team", {
+            "off_epa_per_play": f"{side}_off_epa",
+            "off_pass_epa": f"{side}_off_pass_epa",
+            "off_rush_epa": f"{side}_off_rush_epa",
+            "def_epa_per_play": f"{side}_def_epa",
+            "def_pass_epa": f"{side}_def_pass_epa",
+            "def_rush_epa": f"{side}_def_rush_epa"
+        })
+    
+    # Home team scoring
+    attach_team_stats(df, scoring_by_team, "home_team", {
+        "ppg": "home_ppg",
+        "home_ppg": "home_ppg_at_home",
+        "plays_per_game": "home_plays_per_game",
+        "points_per_play": "home_points_per_play"
+    })
+    
+    # Away team scoring
+    attach_team_stats(df, scoring_by_team, "away_team", {
+        "ppg": "away_ppg",
+        "away_ppg": "away_ppg_on_road",
+        "plays_per_game": "away_plays_per_game",
+        "points_per_play": "away_points_per_play"
+    })
     
     # Derived features
     df["off_epa_diff"] = df["home_off_epa"] - df["away_off_epa"]
@@ -318,8 +306,13 @@ def build_training_data(
     return df
 
 
+def predict_totals(coef: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """Apply fitted coefficients (intercept first) to a feature matrix."""
+    return coef[0] + X @ coef[1:]
+
+
 def train_model(train_df: pd.DataFrame) -> tuple:
-    """Train linear regression model."""
+    """Train linear regression model (ordinary least squares, intercept first)."""
     print("  Training model...")
     
     feature_cols = [
@@ -331,27 +324,32 @@ def train_model(train_df: pd.DataFrame) -> tuple:
         "home_matchup_edge", "away_matchup_edge"
     ]
     
-    X = train_df[feature_cols]
-    y = train_df["total_points"]
+    # Row-major float64: float32 is not precise enough for the rank-deficient solve below
+    X = np.ascontiguousarray(train_df[feature_cols].to_numpy(dtype=np.float64))
+    y = train_df["total_points"].to_numpy(dtype=np.float64)
     
-    model = LinearRegression()
-    model.fit(X, y)
+    # A single least-squares solve; the diff/edge features are linear in the others,
+    # so the matrix is rank-deficient and lstsq returns the minimum-norm solution
+    X1 = np.column_stack((np.ones(len(X)), X))
+    coef, *_ = np.linalg.lstsq(X1, y, rcond=None)
     
-    y_pred = model.predict(X)
+    # lstsq only reports the residual sum for full-rank input, so take it from the fit
+    residuals = y - predict_totals(coef, X)
+    ss_res = residuals @ residuals
     metrics = {
-        "r2_score": round(r2_score(y, y_pred), 4),
-        "mae": round(mean_absolute_error(y, y_pred), 2),
-        "rmse": round(np.sqrt(mean_squared_error(y, y_pred)), 2),
+        "r2_score": round(1 - ss_res / np.sum((y - y.mean()) ** 2), 4),
+        "mae": round(np.mean(np.abs(residuals)), 2),
+        "rmse": round(np.sqrt(ss_res / len(y)), 2),
         "training_samples": len(train_df)
     }
     
     print(f"  Model R²: {metrics['r2_score']}, MAE: {metrics['mae']}")
-    return model, feature_cols, metrics
+    return coef, feature_cols, metrics
 
 
 def project_games(
     matchups: list[dict],
-    model,
+    coef: np.ndarray,
     feature_cols: list[str],
     team_epa: pd.DataFrame,
     team_scoring: pd.DataFrame
@@ -361,22 +359,29 @@ def project_games(
     
     projections = []
     
+    # Team stat rows keyed by abbreviation
+    epa_by_team = team_epa.set_index("team").to_dict("index")
+    scoring_by_team = team_scoring.set_index("team").to_dict("index")
+    
+    # Collect each projectable matchup's stats and features, then predict them all at once
+    games = []
+    feature_rows = []
     for matchup in matchups:
         home = matchup["home_team"]
         away = matchup["away_team"]
         
         # Get team stats
-        home_epa = team_epa[team_epa["team"] == home].iloc[0] if len(team_epa[team_epa["team"] == home]) > 0 else None
-        away_epa = team_epa[team_epa["team"] == away].iloc[0] if len(team_epa[team_epa["team"] == away]) > 0 else None
-        home_scoring = team_scoring[team_scoring["team"] == home].iloc[0] if len(team_scoring[team_scoring["team"] == home]) > 0 else None
-        away_scoring = team_scoring[team_scoring["team"] == away].iloc[0] if len(team_scoring[team_scoring["team"] == away]) > 0 else None
+        home_epa = epa_by_team.get(home)
+        away_epa = epa_by_team.get(away)
+        home_scoring = scoring_by_team.get(home)
+        away_scoring = scoring_by_team.get(away)
         
         if home_epa is None or away_epa is None or home_scoring is None or away_scoring is None:
             print(f"  Warning: Missing data for {home} vs {away}")
             continue
         
         # Build feature vector
-        features = {
+        feature_rows.append({
             "home_off_epa": home_epa["off_epa_per_play"],
             "home_def_epa": home_epa["def_epa_per_play"],
             "home_off_pass_epa": home_epa["off_pass_epa"],
@@ -393,10 +398,18 @@ def project_games(
             "def_epa_diff": home_epa["def_epa_per_play"] - away_epa["def_epa_per_play"],
             "home_matchup_edge": home_epa["off_epa_per_play"] - away_epa["def_epa_per_play"],
             "away_matchup_edge": away_epa["off_epa_per_play"] - home_epa["def_epa_per_play"],
-        }
-        
-        X = pd.DataFrame([features])[feature_cols]
-        model_total = model.predict(X)[0]
+        })
+        games.append((matchup, home_epa, away_epa, home_scoring, away_scoring))
+    
+    # Order the features the way the coefficients were fit, as a row-major matrix
+    X = np.array(
+        [[row[col] for col in feature_cols] for row in feature_rows], dtype=np.float64
+    ).reshape(len(feature_rows), len(feature_cols))
+    model_totals = predict_totals(coef, X) if feature_rows else []
+    
+    for (matchup, home_epa, away_epa, home_scoring, away_scoring), model_total in zip(games, model_totals):
+        home = matchup["home_team"]
+        away = matchup["away_team"]
         
         vegas_total = matchup["vegas_total"]
         edge = model_total - vegas_total
@@ -476,24 +489,26 @@ def main():
     # Step 2: Calculate team metrics
     print("\nSTEP 2: CALCULATING TEAM METRICS")
     print("-" * 40)
-    team_epa = calculate_team_epa(pbp)
-    team_scoring = calculate_team_scoring(pbp)
+    plays = select_scrimmage_plays(pbp)
+    team_epa = calculate_team_epa(plays)
+    games = extract_games(pbp)
+    team_scoring = calculate_team_scoring(plays, games)
     
     # Step 3: Get game results and build training data
     print("\nSTEP 3: BUILDING TRAINING DATA")
     print("-" * 40)
-    games = get_game_results(pbp)
+    games = get_game_results(games)
     train_df = build_training_data(games, team_epa, team_scoring)
     
     # Step 4: Train model
     print("\nSTEP 4: TRAINING MODEL")
     print("-" * 40)
-    model, feature_cols, model_metrics = train_model(train_df)
+    coef, feature_cols, model_metrics = train_model(train_df)
     
     # Step 5: Generate projections
     print("\nSTEP 5: GENERATING PROJECTIONS")
     print("-" * 40)
-    projections = project_games(PLAYOFF_MATCHUPS, model, feature_cols, team_epa, team_scoring)
+    projections = project_games(PLAYOFF_MATCHUPS, coef, feature_cols, team_epa, team_scoring)
     
     # Step 6: Calculate summary stats
     summary_stats = calculate_summary_stats(projections)
@@ -510,8 +525,11 @@ def main():
         "games": projections,
     }
     
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(output_data, f, indent=2, cls=NumpyEncoder)
+    # orjson serializes the numpy scalars in projections/metrics natively
+    OUTPUT_FILE.write_bytes(orjson.dumps(
+        output_data,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+    ))
     
     print(f"  Exported to {OUTPUT_FILE}")
     
@@ -5,8 +5,9 @@ Fetches this weekend's NFL games with Vegas lines
 Run with: python3 scripts/fetch_vegas_lines.py
 """
 
-import json
+import orjson
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 import re
@@ -14,6 +15,9 @@ import re
 OUTPUT_DIR = Path("public/data")
 OUTPUT_FILE = OUTPUT_DIR / "vegas_lines.json"
 
+# Shared session so the API calls reuse pooled connections
+SESSION = requests.Session()
+
 # Team name mapping for display
 TEAM_NAMES = {
     "ARI": "Cardinals", "ATL": "Falcons", "BAL": "Ravens", "BUF": "Bills",
@@ -37,7 +41,7 @@ def fetch_from_the_odds_api() -> list:
             "regions": "us",
             "markets": "totals",
         }
-        response = requests.get(url, params=params, timeout=5)
+        response = SESSION.get(url, params=params, timeout=5)
         if response.status_code == 200:
             data = response.json()
             events = data.get("data", [])
@@ -56,7 +60,7 @@ def fetch_from_espn_schedule() -> list:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        response = requests.get(url, headers=headers, timeout=5)
+        response = SESSION.get(url, headers=headers, timeout=5)
         if response.status_code == 200:
             data = response.json()
             events = data.get("events", [])
@@ -72,7 +76,7 @@ def fetch_from_sports_data() -> list:
     try:
         url = "https://api.sportsdata.io/v3/nfl/scores/json/CurrentSeason"
         headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers, timeout=5)
+        response = SESSION.get(url, headers=headers, timeout=5)
         if response.status_code == 200:
             print(f"    Found games from sports-data")
             return response.json()
@@ -81,20 +85,28 @@ def fetch_from_sports_data() -> list:
     return None
 
 def fetch_from_all_sources() -> list:
-    """Try multiple free APIs."""
+    """Try multiple free APIs concurrently."""
     sources = [
         fetch_from_the_odds_api,
         fetch_from_espn_schedule,
         fetch_from_sports_data,
     ]
     
-    for fetch_func in sources:
-        try:
-            result = fetch_func()
-            if result:
-                return result
-        except:
-            pass
+    # The sources are independent, so query them all at once, but still take the
+    # first usable answer in the order listed above
+    executor = ThreadPoolExecutor(max_workers=len(sources))
+    try:
+        futures = [executor.submit(fetch_func) for fetch_func in sources]
+        for future in futures:
+            try:
+                result = future.result()
+                if result:
+                    return result
+            except:
+                pass
+    finally:
+        # Don't wait on the lower-priority sources once we have a result
+        executor.shutdown(wait=False, cancel_futures=True)
     
     return None
 
@@ -264,8 +276,7 @@ def main():
     }
     
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(output_data, f, indent=2)
+    OUTPUT_FILE.write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
     
     print(f"  Exported to {OUTPUT_FILE}")
     print(f"  Total games: {len(parsed_games)}")
@@ -0,0 +1,28 @@
+"""
+Team Stat Tables
+Packs per-team stat dicts (e.g. enhanced_analysis.json's team_stats) into one
+float64 array per stat, so per-game features are gathered by team index.
+"""
+
+import numpy as np
+
+
+def build_team_table(stats_by_team, fields):
+    """
+    Pack {team: {field: value}} into {field: float64 array} indexed by team id.
+    The extra last row is all zeros and stands in for teams without stats.
+    Returns: (team_ids, table)
+    """
+    team_ids = {team: i for i, team in enumerate(stats_by_team)}
+    table = {}
+    for field in fields:
+        values = np.zeros(len(team_ids) + 1, dtype=np.float64)
+        values[:-1] = [stats.get(field, 0) for stats in stats_by_team.values()]
+        table[field] = values
+    return team_ids, table
+
+
+def lookup_team_ids(team_ids, teams):
+    """Map team abbreviations to table rows; unknown teams map to the zero row"""
+    missing = len(team_ids)
+    return np.fromiter((team_ids.get(team, missing) for team in teams), dtype=np.intp)